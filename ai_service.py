@@ -1,64 +1,28 @@
+import asyncio
 import os
 import json
 from groq import Groq
 from typing import Optional, Dict
-from googleapiclient.discovery import build
+from core.http import close_http_client
+from services.tools import youtube_search
 from youtube_transcript_api import YouTubeTranscriptApi, NoTranscriptFound
 from dotenv import load_dotenv
 
 load_dotenv()
 
-client = Groq(api_key=os.environ.get('GROQ_API_KEY'))
-
-YOUTUBE_API_KEY = os.environ.get('YOUTUBE_API_KEY')
-
 def search_video(query: str) -> Optional[Dict]:
     """
     Search for a YouTube video and return its metadata
     """
-    try:
-        youtube = build('youtube', 'v3', developerKey=YOUTUBE_API_KEY)
-
-        request = youtube.search().list(
-            part="snippet",
-            maxResults=10,
-            q=query,
-            type="video"
-        )
-        response = request.execute()
-
-        if not response['items']:
-            return None
+    async def search() -> Optional[Dict]:
+        try:
+            return await youtube_search(query)
+        finally:
+            # The pooled client is bound to this asyncio.run loop; the next call builds its own
+            await close_http_client()
 
-        results = []
-        
-        # Process all videos in the response
-        for video in response['items']:
-            video_id = video['id']['videoId']
-            
-            # Get additional video details
-            video_request = youtube.videos().list(
-                part="snippet,statistics",
-                id=video_id
-            )
-            video_response = video_request.execute()
-            
-            if video_response['items']:
-                video_details = video_response['items'][0]
-                
-                results.append({
-                    'video_id': video_id,
-                    'title': video_details['snippet']['title'],
-                    'description': video_details['snippet']['description'],
-                    'channel': video_details['snippet']['channelTitle'],
-                    'views': video_details['statistics'].get('viewCount', '0'),
-                    'url': f'https://www.youtube.com/watch?v={video_id}',
-                    'thumbnail': video_details['snippet']['thumbnails']['high']['url']
-                })
-        
-        return results
-    except Exception as e:
-        raise Exception(f"Error searching YouTube video: {str(e)}")
+    # Shares the batched videos.list lookup with the API tools
+    return asyncio.run(search())
 
 def get_video_transcript(video_id: str):
     """
@@ -171,44 +135,55 @@ messages = [
     }
 ]
 
-response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",  # Using Llama 3.3 70B versatile model,
-            messages=messages,
-            tools=tools,
-            tool_choice='auto',
-            temperature=0.7,
-            max_tokens=1000
-        )
-
-response_message = response.choices[0].message
-tool_calls = response_message.tool_calls
-print(f"Initial Response: \n{response.choices[0].message}\n\n")
-
-if tool_calls:
-    available_funtions = {
-        "search_video": search_video,
-        "get_video_transcript":get_video_transcript
-    }
-    messages.append(response_message)
-
-    for tool_call in tool_calls:
-        function_name = tool_call.function.name
-        function_to_call = available_funtions.get(function_name, None)
-        funtion_args = json.loads(tool_call.function.arguments)
-        function_response = function_to_call(**funtion_args)
-        messages.append(
-            {
-                "tool_call_id": tool_call.id,
-                "role":"tool",
-                "name": function_name,
-                "content": str(function_response)
-            }
-        )
-
-        second_response = client.chat.completions.create(
-            model="llama-3.3-versatile",
-            messages=messages
-        )
-        response = second_response
-
-print(f"Final Response: {response.choices[0].message.content}\n\n")
\ No newline at end of file
+def main():
+    """
+    Run one tool-calling round trip against Groq. Only runs as a script, so
+    importing this module makes no API calls.
+    """
+    client = Groq(api_key=os.environ.get('GROQ_API_KEY'))
+
+    response = client.chat.completions.create(
+                model="llama-3.3-70b-versatile",  # Using Llama 3.3 70B versatile model,
+                messages=messages,
+                tools=tools,
+                tool_choice='auto',
+                temperature=0.7,
+                max_tokens=1000
+            )
+
+    response_message = response.choices[0].message
+    tool_calls = response_message.tool_calls
+    print(f"Initial Response: \n{response.choices[0].message}\n\n")
+
+    if tool_calls:
+        available_funtions = {
+            "search_video": search_video,
+            "get_video_transcript":get_video_transcript
+        }
+        messages.append(response_message)
+
+        for tool_call in tool_calls:
+            function_name = tool_call.function.name
+            function_to_call = available_funtions.get(function_name, None)
+            funtion_args = json.loads(tool_call.function.arguments)
+            function_response = function_to_call(**funtion_args)
+            messages.append(
+                {
+                    "tool_call_id": tool_call.id,
+                    "role":"tool",
+                    "name": function_name,
+                    "content": str(function_response)
+                }
+            )
+
+            second_response = client.chat.completions.create(
+                model="llama-3.3-versatile",
+                messages=messages
+            )
+            response = second_response
+
+    print(f"Final Response: {response.choices[0].message.content}\n\n")
+
+
+if __name__ == "__main__":
+    main()
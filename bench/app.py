@@ -0,0 +1,14 @@
+"""
+ASGI entrypoint for benchmarks: the real application with Firestore swapped
+for the in-memory fake (unless STORAGE_BACKEND selects another backend).
+Started by bench/run.py with the upstream base URLs pointing at bench.fakes.
+"""
+from bench.fake_firestore import FakeAsyncClient
+from services.storage import get_storage
+from services.storage.firestore import FirestoreStorage
+
+storage = get_storage()
+if isinstance(storage, FirestoreStorage):
+    storage._client = FakeAsyncClient()
+
+from main import app  # noqa: E402
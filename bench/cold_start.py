@@ -0,0 +1,127 @@
+"""
+Cold start measurement: how long a fresh API process takes to import the
+app, to start answering, and to serve its first authenticated request.
+
+    python -m bench.cold_start --runs 5
+    python -m bench.cold_start --budget import=800 ready=1500 first_request=2500
+
+Each run starts a new interpreter against the local upstream fakes, like a
+container scaled up from zero. Medians are reported, and the process exits
+non-zero when a --budget (milliseconds) is exceeded.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+import httpx
+from bench.fakes import make_id_token
+from bench.run import (
+    PROJECT_ID, ROOT, api_environment, free_port, parse_budgets, start_server, wait_until_ready
+)
+
+
+def measure_import(env: Dict[str, str]) -> float:
+    """
+    Seconds spent importing `main` in a fresh interpreter.
+    """
+    output = subprocess.check_output(
+        [sys.executable, "-c", "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"],
+        cwd=ROOT,
+        env=env
+    )
+    return float(output.decode().strip().splitlines()[-1])
+
+
+async def wait_for(client: httpx.AsyncClient, method: str, url: str, timeout: float = 60.0, **kwargs) -> httpx.Response:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            return await client.request(method, url, **kwargs)
+        except httpx.TransportError:
+            await asyncio.sleep(0.01)
+    raise RuntimeError(f"{url} did not answer")
+
+
+async def measure_start(api_port: int, env: Dict[str, str]) -> Dict[str, float]:
+    """
+    Start the API and time the first response and the first authenticated request.
+    """
+    api_url = f"http://127.0.0.1:{api_port}"
+    token = make_id_token("cold-start-user", PROJECT_ID)
+
+    started = time.perf_counter()
+    api = start_server("main:app", api_port, env)
+    try:
+        async with httpx.AsyncClient(base_url=api_url, timeout=60.0) as client:
+            await wait_for(client, "GET", "/")
+            ready = time.perf_counter() - started
+
+            request_started = time.perf_counter()
+            response = await client.get(
+                "/api/sessions", params={"limit": 20}, headers={"Authorization": f"Bearer {token}"}
+            )
+            response.raise_for_status()
+            first_request = time.perf_counter() - request_started
+    finally:
+        api.terminate()
+        api.wait(timeout=10)
+
+    return {"ready": ready, "first_request": first_request}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", nargs="*", default=[], help="import|ready|first_request=ms, fail when exceeded")
+    parser.add_argument("--json", dest="json_out", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    fakes_port = free_port()
+    data_dir = tempfile.mkdtemp(prefix="easywatch-cold-start-")
+    fakes = start_server("bench.fakes:app", fakes_port, {
+        **os.environ,
+        "GOOGLE_CLOUD_PROJECT": PROJECT_ID,
+        "BENCH_AUTH_LATENCY_MS": "0",
+    })
+
+    samples: Dict[str, List[float]] = {"import": [], "ready": [], "first_request": []}
+    try:
+        asyncio.run(wait_until_ready(f"http://127.0.0.1:{fakes_port}/docs"))
+        for _ in range(args.runs):
+            api_port = free_port()
+            # SQLite storage runs the real persistence path without Google credentials
+            env = api_environment(fakes_port, api_port, "sqlite", data_dir)
+
+            samples["import"].append(measure_import(env))
+            for name, value in asyncio.run(measure_start(api_port, env)).items():
+                samples[name].append(value)
+    finally:
+        fakes.terminate()
+        fakes.wait(timeout=10)
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    results = {name: statistics.median(values) * 1000 for name, values in samples.items()}
+    for name, milliseconds in results.items():
+        print(f"{name:<14} {milliseconds:>9.1f} ms")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    failed = False
+    for name, budget in parse_budgets(args.budget).items():
+        if results.get(name, 0.0) > budget:
+            print(f"FAIL {name}: {results[name]:.1f} ms > budget {budget:.1f} ms")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
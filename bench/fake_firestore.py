@@ -0,0 +1,180 @@
+import copy
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+
+DESCENDING = "DESCENDING"
+
+
+def _is_array_union(value: Any) -> bool:
+    return type(value).__name__ == "ArrayUnion" and hasattr(value, "values")
+
+
+def _apply(existing: Dict, data: Dict) -> Dict:
+    result = dict(existing)
+    for key, value in data.items():
+        if _is_array_union(value):
+            current = list(result.get(key) or [])
+            result[key] = current + [item for item in value.values if item not in current]
+        else:
+            result[key] = copy.deepcopy(value)
+    return result
+
+
+class FakeDocumentSnapshot:
+    def __init__(self, reference: "FakeDocumentReference", data: Optional[Dict]):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self) -> Optional[Dict]:
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+    def get(self, field: str) -> Any:
+        return (self._data or {}).get(field)
+
+
+class FakeDocumentReference:
+    def __init__(self, client: "FakeAsyncClient", path: str):
+        self._client = client
+        self.path = path
+        self.id = path.rsplit("/", 1)[-1]
+
+    def collection(self, name: str) -> "FakeCollectionReference":
+        return FakeCollectionReference(self._client, f"{self.path}/{name}")
+
+    def _write(self, data: Dict, merge: bool = False) -> None:
+        existing = self._client._docs.get(self.path, {}) if merge else {}
+        self._client._docs[self.path] = _apply(existing, data)
+
+    async def get(self) -> FakeDocumentSnapshot:
+        return FakeDocumentSnapshot(self, copy.deepcopy(self._client._docs.get(self.path)))
+
+    async def set(self, data: Dict, merge: bool = False) -> None:
+        self._write(data, merge)
+
+    async def update(self, data: Dict) -> None:
+        if self.path not in self._client._docs:
+            raise KeyError(f"No document to update: {self.path}")
+        self._write(data, merge=True)
+
+    async def delete(self) -> None:
+        self._client._docs.pop(self.path, None)
+
+
+class FakeQuery:
+    def __init__(self, client: "FakeAsyncClient", path: str, filters=(), orders=(), limit=None, start_after=None):
+        self._client = client
+        self._path = path
+        self._filters: Tuple = tuple(filters)
+        self._orders: Tuple = tuple(orders)
+        self._limit = limit
+        self._start_after = start_after
+
+    def _copy(self, **changes) -> "FakeQuery":
+        state = {
+            "filters": self._filters,
+            "orders": self._orders,
+            "limit": self._limit,
+            "start_after": self._start_after,
+        }
+        state.update(changes)
+        return FakeQuery(self._client, self._path, **state)
+
+    def where(self, field: str, op: str, value: Any) -> "FakeQuery":
+        return self._copy(filters=self._filters + ((field, op, value),))
+
+    def order_by(self, field: str, direction: str = "ASCENDING") -> "FakeQuery":
+        return self._copy(orders=self._orders + ((field, direction),))
+
+    def limit(self, count: int) -> "FakeQuery":
+        return self._copy(limit=count)
+
+    def start_after(self, cursor) -> "FakeQuery":
+        return self._copy(start_after=cursor)
+
+    def _matches(self, data: Dict) -> bool:
+        for field, op, value in self._filters:
+            if op == "==" and data.get(field) != value:
+                return False
+            if op == "array_contains" and value not in (data.get(field) or []):
+                return False
+        return all(field in data for field, _ in self._orders)
+
+    def _documents(self) -> List[FakeDocumentSnapshot]:
+        prefix = f"{self._path}/"
+        docs = [
+            (path.rsplit("/", 1)[-1], data) for path, data in self._client._docs.items()
+            if path.startswith(prefix) and "/" not in path[len(prefix):]
+        ]
+        docs = [(doc_id, data) for doc_id, data in docs if self._matches(data)]
+
+        # Stable multi-key sort, applied from the least significant order down
+        docs.sort(key=lambda item: item[0])
+        for field, direction in reversed(self._orders):
+            docs.sort(key=lambda item: item[1].get(field), reverse=direction == DESCENDING)
+
+        if self._start_after is not None:
+            # Snapshots and plain dicts both expose the ordered field values via .get()
+            cursor = [self._start_after.get(field) for field, _ in self._orders]
+            docs = [item for item in docs if self._after(item[1], cursor)]
+
+        if self._limit is not None:
+            docs = docs[:self._limit]
+
+        return [
+            FakeDocumentSnapshot(FakeDocumentReference(self._client, f"{self._path}/{doc_id}"), copy.deepcopy(data))
+            for doc_id, data in docs
+        ]
+
+    def _after(self, data: Dict, cursor: List) -> bool:
+        for (field, direction), bound in zip(self._orders, cursor):
+            value = data.get(field)
+            if value == bound:
+                continue
+            return value < bound if direction == DESCENDING else value > bound
+        return False
+
+    async def stream(self):
+        for snapshot in self._documents():
+            yield snapshot
+
+
+class FakeCollectionReference(FakeQuery):
+    def __init__(self, client: "FakeAsyncClient", path: str):
+        super().__init__(client, path)
+        self.id = path.rsplit("/", 1)[-1]
+
+    def document(self, document_id: Optional[str] = None) -> FakeDocumentReference:
+        return FakeDocumentReference(self._client, f"{self._path}/{document_id or uuid.uuid4().hex[:20]}")
+
+
+class FakeWriteBatch:
+    def __init__(self):
+        self._writes = []
+
+    def set(self, reference: FakeDocumentReference, data: Dict, merge: bool = False) -> None:
+        self._writes.append((reference, data, merge))
+
+    async def commit(self) -> None:
+        for reference, data, merge in self._writes:
+            reference._write(data, merge)
+        self._writes = []
+
+
+class FakeAsyncClient:
+    """
+    In-memory stand-in for the subset of `firestore.AsyncClient` used by the
+    services: documents, sub-collections, equality/array_contains filters,
+    ordering, limits, start_after cursors and write batches.
+    """
+
+    def __init__(self):
+        self._docs: Dict[str, Dict] = {}
+
+    def collection(self, name: str) -> FakeCollectionReference:
+        return FakeCollectionReference(self, name)
+
+    def batch(self) -> FakeWriteBatch:
+        return FakeWriteBatch()
@@ -0,0 +1,203 @@
+"""
+Local stand-ins for every upstream the API talks to: Gemini, the YouTube Data
+API, youtube-transcript.io and the Firebase Auth emulator endpoints.
+
+Run with `uvicorn bench.fakes:app`. Latency and payload sizes are read from
+the environment:
+
+    BENCH_GEMINI_LATENCY_MS      per Gemini call (spread over stream chunks)
+    BENCH_EMBED_LATENCY_MS       per Gemini embedding batch
+    BENCH_YOUTUBE_LATENCY_MS     per YouTube Data API call
+    BENCH_TRANSCRIPT_LATENCY_MS  per youtube-transcript.io call
+    BENCH_AUTH_LATENCY_MS        per Firebase Auth call
+    BENCH_TRANSCRIPT_WORDS       words per transcript
+    BENCH_SUMMARY_WORDS          words per generated summary
+    BENCH_STREAM_CHUNKS          chunks per streamed summary
+"""
+import asyncio
+import base64
+import json
+import os
+import re
+import time
+import zlib
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+
+GEMINI_LATENCY = int(os.getenv("BENCH_GEMINI_LATENCY_MS", "800")) / 1000
+EMBED_LATENCY = int(os.getenv("BENCH_EMBED_LATENCY_MS", "100")) / 1000
+YOUTUBE_LATENCY = int(os.getenv("BENCH_YOUTUBE_LATENCY_MS", "80")) / 1000
+TRANSCRIPT_LATENCY = int(os.getenv("BENCH_TRANSCRIPT_LATENCY_MS", "600")) / 1000
+AUTH_LATENCY = int(os.getenv("BENCH_AUTH_LATENCY_MS", "30")) / 1000
+TRANSCRIPT_WORDS = int(os.getenv("BENCH_TRANSCRIPT_WORDS", "3000"))
+SUMMARY_WORDS = int(os.getenv("BENCH_SUMMARY_WORDS", "400"))
+STREAM_CHUNKS = int(os.getenv("BENCH_STREAM_CHUNKS", "20"))
+
+URL_PATTERN = re.compile(r"(?:v=|youtu\.be/|/shorts/|/embed/)([\w-]+)")
+
+app = FastAPI(title="EasyWatch upstream fakes")
+
+
+def _b64(data: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def make_id_token(uid: str, project_id: str, lifetime: int = 3600) -> str:
+    """
+    Mint an unsigned ID token, accepted by firebase_admin when
+    FIREBASE_AUTH_EMULATOR_HOST is set.
+    """
+    now = int(time.time())
+    payload = {
+        "iss": f"https://securetoken.google.com/{project_id}",
+        "aud": project_id,
+        "auth_time": now,
+        "user_id": uid,
+        "sub": uid,
+        "iat": now,
+        "exp": now + lifetime,
+        "firebase": {"identities": {}, "sign_in_provider": "password"}
+    }
+    return f"{_b64({'alg': 'none', 'typ': 'JWT'})}.{_b64(payload)}."
+
+
+def _words(count: int, seed: str) -> str:
+    vocabulary = ["video", "topic", "example", "speaker", "explains", "result", "idea", "step", "important", seed]
+    return " ".join(vocabulary[i % len(vocabulary)] for i in range(count))
+
+
+def _prompt_text(body: dict) -> str:
+    return " ".join(
+        part.get("text", "")
+        for content in body.get("contents", [])
+        for part in content.get("parts", [])
+    )
+
+
+def _candidate(parts: list) -> dict:
+    return {
+        "candidates": [{"content": {"role": "model", "parts": parts}, "finishReason": "STOP", "index": 0}],
+        "usageMetadata": {"promptTokenCount": 0, "candidatesTokenCount": 0, "totalTokenCount": 0}
+    }
+
+
+def _plan(prompt: str) -> list:
+    query = prompt.rsplit("User Query:", 1)[-1].strip()
+    match = URL_PATTERN.search(query)
+    if match:
+        return [{"functionCall": {"name": "get_transcript_from_url", "args": {"youtube_url": f"https://www.youtube.com/watch?v={match.group(1)}"}}}]
+    if "video" in query.lower() or "search" in query.lower():
+        return [{"functionCall": {"name": "youtube_search", "args": {"query": query}}}]
+    return [{"text": _words(60, "answer")}]
+
+
+def _embedding(text: str, dimensions: int = 64) -> list:
+    """
+    Hashed bag of words: texts sharing words get similar vectors.
+    """
+    values = [0.0] * dimensions
+    for word in re.findall(r"\w+", text.lower()):
+        values[zlib.crc32(word.encode()) % dimensions] += 1.0
+    return values
+
+
+@app.post("/{version}/models/{target}")
+async def gemini(version: str, target: str, request: Request):
+    body = await request.json()
+    prompt = _prompt_text(body)
+    _, _, action = target.partition(":")
+
+    if action == "batchEmbedContents":
+        await asyncio.sleep(EMBED_LATENCY)
+        return {"embeddings": [
+            {"values": _embedding(" ".join(part.get("text", "") for part in item["content"].get("parts", [])))}
+            for item in body.get("requests", [])
+        ]}
+
+    is_plan = "User Query:" in prompt and body.get("tools")
+
+    if action == "streamGenerateContent":
+        text = _words(SUMMARY_WORDS, "summary")
+        step = max(len(text) // STREAM_CHUNKS, 1)
+
+        async def stream():
+            for start in range(0, len(text), step):
+                await asyncio.sleep(GEMINI_LATENCY / STREAM_CHUNKS)
+                yield f"data: {json.dumps(_candidate([{'text': text[start:start + step]}]))}\r\n\r\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    await asyncio.sleep(GEMINI_LATENCY)
+    if is_plan:
+        return _candidate(_plan(prompt))
+    return _candidate([{"text": _words(SUMMARY_WORDS, "summary")}])
+
+
+@app.get("/youtube/v3/search")
+async def youtube_search(q: str, maxResults: int = 10):
+    await asyncio.sleep(YOUTUBE_LATENCY)
+    return {"items": [
+        {"id": {"kind": "youtube#video", "videoId": f"s{zlib.crc32(q.encode()) % 10**6:06d}{i:04d}"}}
+        for i in range(maxResults)
+    ]}
+
+
+@app.get("/youtube/v3/videos")
+async def youtube_videos(id: str):
+    await asyncio.sleep(YOUTUBE_LATENCY)
+    return {"items": [
+        {
+            "id": video_id,
+            "snippet": {
+                "title": f"Video {video_id}",
+                "description": _words(40, video_id),
+                "channelTitle": "Bench Channel",
+                "publishedAt": "2024-01-01T00:00:00Z",
+                "thumbnails": {"high": {"url": f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"}}
+            },
+            "contentDetails": {"duration": "PT12M"},
+            "statistics": {"viewCount": "1000"}
+        }
+        for video_id in id.split(",") if video_id
+    ]}
+
+
+@app.post("/api/transcripts")
+async def transcripts(request: Request):
+    body = await request.json()
+    await asyncio.sleep(TRANSCRIPT_LATENCY)
+    words = _words(TRANSCRIPT_WORDS, "transcript").split(" ")
+    results = []
+    for video_id in body.get("ids", []):
+        segments = [
+            {"text": " ".join(words[i:i + 10]), "start": str(i * 0.4), "dur": "4.0"}
+            for i in range(0, len(words), 10)
+        ]
+        results.append({"id": video_id, "tracks": [{"language": "en", "transcript": segments}]})
+    return results
+
+
+@app.post("/v1/accounts:signInWithPassword")
+async def sign_in(request: Request):
+    body = await request.json()
+    await asyncio.sleep(AUTH_LATENCY)
+    uid = body.get("email", "bench").split("@")[0]
+    project_id = os.getenv("GOOGLE_CLOUD_PROJECT", "bench-project")
+    return {
+        "localId": uid,
+        "email": body.get("email"),
+        "idToken": make_id_token(uid, project_id),
+        "refreshToken": "bench-refresh-token",
+        "expiresIn": "3600"
+    }
+
+
+@app.post("/identitytoolkit.googleapis.com/v1/projects/{project_id}/accounts:lookup")
+async def accounts_lookup(project_id: str, request: Request):
+    body = await request.json()
+    await asyncio.sleep(AUTH_LATENCY)
+    return {"users": [
+        {"localId": uid, "email": f"{uid}@bench.local", "displayName": uid, "validSince": "0"}
+        for uid in body.get("localId", [])
+    ]}
@@ -0,0 +1,262 @@
+"""
+Offline load test: starts the upstream fakes and the API (with in-memory
+Firestore) as local processes, drives concurrent traffic and reports
+throughput and latency percentiles per scenario.
+
+    python -m bench.run --requests 200 --concurrency 20
+    python -m bench.run --scenarios chat --gemini-latency-ms 1500 --budget chat=3000
+
+No Google credentials or network access are needed. Exits non-zero when a
+--budget p95 (milliseconds) is exceeded so it can gate deploys.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+import httpx
+from bench.fakes import make_id_token
+
+
+PROJECT_ID = "bench-project"
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(target: str, port: int, env: Dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", target, "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT,
+        env=env
+    )
+
+
+async def wait_until_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not start")
+
+
+def api_environment(fakes_port: int, api_port: int, storage: str, data_dir: str) -> Dict[str, str]:
+    """
+    Environment for the API process: dummy required settings and every upstream
+    pointed at the fakes on `fakes_port`.
+    """
+    fakes_url = f"http://127.0.0.1:{fakes_port}"
+    return {
+        **os.environ,
+        # Required settings; none of these reach a real service
+        "FIREBASE_CREDENTIALS": "unused",
+        "FIREBASE_WEB_API_KEY": "bench",
+        "GROQ_API_KEY": "bench",
+        "PROJECT_ID": PROJECT_ID,
+        "YOUTUBE_API_KEY": "bench",
+        "UVICORN_PORT": str(api_port),
+        "YOUTUBE_TRANSCRIPT_IO_API_TOKEN": "bench",
+        "GEMINI_API_KEY": "bench",
+        # Upstreams
+        "GEMINI_BASE_URL": fakes_url,
+        "YOUTUBE_API_URL": f"{fakes_url}/youtube/v3",
+        "TRANSCRIPT_API_URL": f"{fakes_url}/api/transcripts",
+        "IDENTITY_TOOLKIT_URL": f"{fakes_url}/v1",
+        "FIREBASE_AUTH_EMULATOR_HOST": f"127.0.0.1:{fakes_port}",
+        "STORAGE_BACKEND": "sqlite" if storage == "sqlite" else "firestore",
+        "STORAGE_SQLITE_PATH": os.path.join(data_dir, "easywatch.db"),
+        "CACHE_DIR": data_dir,
+        # Any real Firestore client fails fast instead of reaching Google; bench.app injects the fake
+        "FIRESTORE_EMULATOR_HOST": "127.0.0.1:1",
+        "TRANSCRIPT_CACHE_BACKEND": "none",
+        "SUMMARY_CACHE_BACKEND": "none",
+        "JOB_STORE_BACKEND": "memory",
+    }
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+async def run_scenario(name: str, make_request, total: int, concurrency: int) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for index in counter:
+            start = time.perf_counter()
+            try:
+                response = await make_request(index)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "scenario": name,
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": total / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+async def drive(args, api_url: str) -> List[Dict]:
+    users = [f"bench-user-{i}" for i in range(args.users)]
+    tokens = {user: make_id_token(user, PROJECT_ID) for user in users}
+
+    def headers(index: int) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {tokens[users[index % len(users)]]}"}
+
+    def session_id(index: int) -> str:
+        user = users[index % len(users)]
+        return f"{user}-session-{(index // len(users)) % args.sessions_per_user}"
+
+    results = []
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=api_url, timeout=300.0, limits=limits) as client:
+
+        async def chat(index: int):
+            if args.search_ratio and index % round(1 / args.search_ratio) == 0:
+                prompt = f"search for bench topic {index % args.unique_videos}"
+            else:
+                prompt = f"https://www.youtube.com/watch?v=v{index % args.unique_videos:010d}"
+            return await client.post(
+                "/api/chat",
+                headers=headers(index),
+                json={"prompt": prompt, "session_id": session_id(index)}
+            )
+
+        async def sessions(index: int):
+            return await client.get("/api/sessions", params={"limit": 20}, headers=headers(index))
+
+        async def messages(index: int):
+            return await client.get(
+                f"/api/sessions/{session_id(index)}/messages", params={"limit": 20}, headers=headers(index)
+            )
+
+        scenarios = {"chat": chat, "sessions": sessions, "messages": messages}
+        for name in args.scenarios:
+            # Unrecorded warm-up so one-off costs (imports, first token checks) are excluded
+            await run_scenario(name, scenarios[name], args.warmup, min(args.concurrency, max(args.warmup, 1)))
+            results.append(await run_scenario(name, scenarios[name], args.requests, args.concurrency))
+
+        metrics = await client.get("/metrics")
+        if args.metrics_out:
+            with open(args.metrics_out, "w", encoding="utf-8") as f:
+                f.write(metrics.text)
+
+    return results
+
+
+def parse_budgets(values: List[str]) -> Dict[str, float]:
+    budgets = {}
+    for value in values:
+        scenario, _, milliseconds = value.partition("=")
+        budgets[scenario] = float(milliseconds)
+    return budgets
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", default=["chat", "sessions", "messages"], choices=["chat", "sessions", "messages"])
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=10, help="unrecorded requests before each scenario")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--sessions-per-user", type=int, default=5)
+    parser.add_argument("--unique-videos", type=int, default=50, help="distinct videos requested; lower values exercise caches")
+    parser.add_argument("--search-ratio", type=float, default=0.2, help="share of chat prompts that are searches")
+    parser.add_argument("--gemini-latency-ms", type=int, default=800)
+    parser.add_argument("--youtube-latency-ms", type=int, default=80)
+    parser.add_argument("--transcript-latency-ms", type=int, default=600)
+    parser.add_argument("--auth-latency-ms", type=int, default=30)
+    parser.add_argument("--transcript-words", type=int, default=3000)
+    parser.add_argument("--summary-words", type=int, default=400)
+    parser.add_argument("--storage", choices=["memory", "sqlite"], default="memory",
+                        help="in-memory fake Firestore or the SQLite backend in a temporary directory")
+    parser.add_argument("--budget", nargs="*", default=[], help="scenario=p95_ms, fail when exceeded")
+    parser.add_argument("--json", dest="json_out", help="write results as JSON to this path")
+    parser.add_argument("--metrics-out", help="write the API's /metrics scrape to this path")
+    args = parser.parse_args()
+
+    fakes_port, api_port = free_port(), free_port()
+    data_dir = tempfile.mkdtemp(prefix="easywatch-bench-")
+    fakes_url = f"http://127.0.0.1:{fakes_port}"
+
+    fakes_env = {
+        **os.environ,
+        "GOOGLE_CLOUD_PROJECT": PROJECT_ID,
+        "BENCH_GEMINI_LATENCY_MS": str(args.gemini_latency_ms),
+        "BENCH_YOUTUBE_LATENCY_MS": str(args.youtube_latency_ms),
+        "BENCH_TRANSCRIPT_LATENCY_MS": str(args.transcript_latency_ms),
+        "BENCH_AUTH_LATENCY_MS": str(args.auth_latency_ms),
+        "BENCH_TRANSCRIPT_WORDS": str(args.transcript_words),
+        "BENCH_SUMMARY_WORDS": str(args.summary_words),
+    }
+    api_env = api_environment(fakes_port, api_port, args.storage, data_dir)
+
+    fakes = start_server("bench.fakes:app", fakes_port, fakes_env)
+    api = start_server("bench.app:app", api_port, api_env)
+    try:
+        async def run():
+            await wait_until_ready(f"{fakes_url}/docs")
+            await wait_until_ready(f"http://127.0.0.1:{api_port}/")
+            return await drive(args, f"http://127.0.0.1:{api_port}")
+
+        results = asyncio.run(run())
+    finally:
+        for process in (api, fakes):
+            process.terminate()
+            process.wait(timeout=10)
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    print(f"{'scenario':<10} {'requests':>8} {'errors':>6} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for result in results:
+        print(
+            f"{result['scenario']:<10} {result['requests']:>8} {result['errors']:>6} {result['throughput_rps']:>8.1f} "
+            f"{result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} {result['p99_ms']:>9.1f}"
+        )
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    failed = False
+    for scenario, budget in parse_budgets(args.budget).items():
+        for result in results:
+            if result["scenario"] == scenario and result["p95_ms"] > budget:
+                print(f"FAIL {scenario}: p95 {result['p95_ms']:.1f} ms > budget {budget:.1f} ms")
+                failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 import os
 
 class Settings(BaseSettings):
@@ -13,6 +14,50 @@ class Settings(BaseSettings):
     UVICORN_PORT: str
     YOUTUBE_TRANSCRIPT_IO_API_TOKEN: str
     GEMINI_API_KEY: str
+    GEMINI_BASE_URL: Optional[str] = None
+    IDENTITY_TOOLKIT_URL: str = "https://identitytoolkit.googleapis.com/v1"
+    YOUTUBE_API_URL: str = "https://www.googleapis.com/youtube/v3"
+    TRANSCRIPT_API_URL: str = "https://www.youtube-transcript.io/api/transcripts"
+    CACHE_DIR: str = ".cache"
+    STORAGE_BACKEND: str = "firestore"
+    STORAGE_SQLITE_PATH: str = "easywatch.db"
+    HTTP2_ENABLED: bool = True
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    TRANSCRIPT_CACHE_BACKEND: str = "firestore"
+    TRANSCRIPT_CACHE_TTL_SECONDS: int = 7 * 24 * 60 * 60
+    TRANSCRIPT_CACHE_MAX_ENTRIES: int = 512
+    TRANSCRIPT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    AUTH_TOKEN_CACHE_MAX_ENTRIES: int = 10000
+    AUTH_CHECK_REVOKED: bool = False
+    ADMIN_API_TOKEN: Optional[str] = None
+    CONTEXT_MAX_TOKENS: int = 2000
+    CONTEXT_RECENT_TURNS: int = 2
+    CONTEXT_COMPACT_TOKENS: int = 150
+    SUMMARY_CONTEXT_MAX_TOKENS: int = 500
+    SUMMARY_CHUNK_TOKENS: int = 24000
+    SUMMARY_SINGLE_CALL_TOKENS: int = 48000
+    SUMMARY_MAP_CONCURRENCY: int = 4
+    JOB_STORE_BACKEND: str = "memory"
+    JOB_WORKERS: int = 4
+    JOB_QUEUE_SIZE: int = 100
+    JOB_TTL_SECONDS: int = 60 * 60
+    SEARCH_CACHE_TTL_SECONDS: int = 60 * 60
+    SEARCH_CACHE_MAX_ENTRIES: int = 2048
+    BATCH_MAX_CONCURRENCY: int = 5
+    SUMMARY_CACHE_BACKEND: str = "firestore"
+    SUMMARY_CACHE_TTL_SECONDS: int = 3 * 24 * 60 * 60
+    SUMMARY_CACHE_MAX_ENTRIES: int = 1024
+    SUMMARY_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    RETRIEVAL_ENABLED: bool = True
+    EMBEDDING_MODEL: str = "text-embedding-004"
+    RETRIEVAL_CHUNK_TOKENS: int = 250
+    RETRIEVAL_TOP_K: int = 4
+    RETRIEVAL_MIN_SCORE: float = 0.3
+    VECTOR_INDEX_MAX_SESSIONS: int = 256
+    VECTOR_INDEX_TTL_SECONDS: int = 30 * 24 * 60 * 60
+    VECTOR_INDEX_MAX_BYTES: int = 512 * 1024 * 1024
 
     class Config:
         env_file = ".env"
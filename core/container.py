@@ -0,0 +1,91 @@
+import asyncio
+import threading
+from functools import lru_cache
+from typing import Optional
+from core.config import Settings, get_settings
+from core.http import close_http_client, init_http_client
+
+
+class Container:
+    """
+    Holds the SDK clients shared by the application and builds each one on
+    first use, so importing the app does no network or credential work.
+
+    The lifespan calls `startup`, which starts warming the clients in a
+    background thread without holding up readiness, and `shutdown`, which
+    closes them. Requests that arrive before warm-up finishes build what they
+    need themselves.
+    """
+
+    def __init__(self, settings: Optional[Settings] = None):
+        self.settings = settings or get_settings()
+        self._lock = threading.Lock()
+        self._firebase_app = None
+        self._gemini = None
+        self._warm_up: Optional[asyncio.Task] = None
+
+    @property
+    def firebase_app(self):
+        if self._firebase_app is None:
+            with self._lock:
+                if self._firebase_app is None:
+                    import firebase_admin
+                    try:
+                        self._firebase_app = firebase_admin.get_app()
+                    except ValueError:
+                        # An explicit project id spares the credential lookup (and its
+                        # metadata server probe) that token verification would otherwise do
+                        self._firebase_app = firebase_admin.initialize_app(
+                            options={"projectId": self.settings.PROJECT_ID}
+                        )
+        return self._firebase_app
+
+    @property
+    def auth(self):
+        """
+        The `firebase_admin.auth` module, once the default app exists.
+        """
+        from firebase_admin import auth
+        self.firebase_app
+        return auth
+
+    @property
+    def gemini(self):
+        if self._gemini is None:
+            with self._lock:
+                if self._gemini is None:
+                    from google import genai
+                    from google.genai import types
+
+                    base_url = self.settings.GEMINI_BASE_URL
+                    self._gemini = genai.Client(
+                        api_key=self.settings.GEMINI_API_KEY,
+                        http_options=types.HttpOptions(base_url=base_url) if base_url else None
+                    )
+        return self._gemini
+
+    def _build_clients(self) -> None:
+        self.firebase_app
+        self.gemini
+
+    async def startup(self) -> None:
+        # One pooled HTTP client for all outbound calls, closed on shutdown
+        init_http_client()
+        self._warm_up = asyncio.create_task(asyncio.to_thread(self._build_clients))
+
+    async def shutdown(self) -> None:
+        if self._warm_up is not None:
+            await asyncio.gather(self._warm_up, return_exceptions=True)
+            self._warm_up = None
+
+        await close_http_client()
+
+        if self._firebase_app is not None:
+            import firebase_admin
+            firebase_admin.delete_app(self._firebase_app)
+            self._firebase_app = None
+
+
+@lru_cache()
+def get_container() -> Container:
+    return Container()
@@ -0,0 +1,90 @@
+from functools import lru_cache
+from typing import Optional, Tuple
+import httpx
+from core.config import get_settings
+
+
+# Upper bounds per upstream, keyed by the Settings field holding its base URL,
+# so overridden endpoints keep their timeouts. Anything else uses DEFAULT_TIMEOUT.
+UPSTREAM_TIMEOUTS = {
+    "TRANSCRIPT_API_URL": httpx.Timeout(30.0, connect=5.0),
+    "YOUTUBE_API_URL": httpx.Timeout(10.0, connect=5.0),
+    "IDENTITY_TOOLKIT_URL": httpx.Timeout(10.0, connect=5.0),
+}
+DEFAULT_TIMEOUT = httpx.Timeout(15.0, connect=5.0)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+@lru_cache()
+def upstream_timeouts() -> Tuple[Tuple[str, dict], ...]:
+    """
+    (base URL, timeout) pairs for the configured upstreams, longest URL first so
+    the most specific one matches when several share a host.
+    """
+    settings = get_settings()
+    pairs = [
+        (getattr(settings, name).rstrip("/"), timeout.as_dict())
+        for name, timeout in UPSTREAM_TIMEOUTS.items()
+    ]
+    return tuple(sorted(pairs, key=lambda pair: len(pair[0]), reverse=True))
+
+
+async def _apply_host_timeout(request: httpx.Request) -> None:
+    url = str(request.url)
+    for base_url, timeout in upstream_timeouts():
+        if url.startswith(base_url):
+            request.extensions["timeout"] = timeout
+            return
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Build the pooled client used for every outbound HTTP call: keep-alive
+    connections, HTTP/2 when the h2 package is installed, bounded pool size
+    and per-host timeouts.
+    """
+    settings = get_settings()
+    return httpx.AsyncClient(
+        http2=settings.HTTP2_ENABLED and _http2_available(),
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS
+        ),
+        timeout=DEFAULT_TIMEOUT,
+        event_hooks={"request": [_apply_host_timeout]}
+    )
+
+
+def init_http_client() -> httpx.AsyncClient:
+    """
+    Create the app-lifetime client. Called from the FastAPI lifespan.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared client, creating it on first use outside the app
+    (scripts, notebooks).
+    """
+    return init_http_client()
@@ -0,0 +1,144 @@
+import functools
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+from fastapi import HTTPException
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(dict(zip(self.labelnames, key)))} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            # Per-bucket counts followed by the running sum and total count
+            state = self._values.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, state in sorted(self._values.items()):
+                labels = dict(zip(self.labelnames, key))
+                for index, bound in enumerate(self.buckets):
+                    lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': bound})} {state[index]}")
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {state[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {state[-2]}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {state[-1]}")
+        return lines
+
+
+REQUEST_DURATION = Histogram(
+    "easywatch_http_request_duration_seconds",
+    "Time to response headers for HTTP requests.",
+    ("method", "route", "status")
+)
+STAGE_DURATION = Histogram(
+    "easywatch_stage_duration_seconds",
+    "Duration of instrumented pipeline stages.",
+    ("stage",)
+)
+STAGE_ERRORS = Counter(
+    "easywatch_stage_errors_total",
+    "Unexpected errors raised by instrumented stages, including upstream failures.",
+    ("stage",)
+)
+
+_metrics = [REQUEST_DURATION, STAGE_DURATION, STAGE_ERRORS]
+_collectors: List[Callable[[], List[str]]] = []
+
+
+def register_collector(collector: Callable[[], List[str]]) -> None:
+    """
+    Register a callable producing exposition lines at scrape time (e.g. cache ratios).
+    """
+    _collectors.append(collector)
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    for collector in _collectors:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
+
+
+class timed:
+    """
+    Record the duration of a stage in STAGE_DURATION, and count errors other
+    than deliberate HTTPExceptions in STAGE_ERRORS.
+
+    Works as `async with timed("stage"):`, `with timed("stage"):` or as a
+    decorator on async functions.
+    """
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        STAGE_DURATION.observe(time.perf_counter() - self._start, stage=self.stage)
+        if exc_type is not None and not issubclass(exc_type, (HTTPException, GeneratorExit)):
+            STAGE_ERRORS.inc(stage=self.stage)
+        return False
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+    def __call__(self, fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with timed(self.stage):
+                return await fn(*args, **kwargs)
+        return wrapper
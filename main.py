@@ -1,14 +1,32 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+import time
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from core.config import get_settings
-import firebase_admin
+from core.container import get_container
+from core.metrics import REQUEST_DURATION, register_collector, render_metrics
 from routes import auth, chat
-
-firebase_admin.initialize_app()
+from services.auth_service import AuthService, token_cache
+from services.cache_service import get_search_cache, get_summary_cache, get_transcript_cache
+from services.job_service import get_job_runner
+from services.storage import get_storage
 
 settings = get_settings()
 
-app = FastAPI(title=settings.PROJECT_NAME)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # SDK clients are built by the container, never at import time
+    container = get_container()
+    await container.startup()
+    await get_job_runner().start()
+    yield
+    await get_job_runner().stop()
+    await get_storage().close()
+    await container.shutdown()
+
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -17,9 +35,25 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
+@app.middleware("http")
+async def record_request_duration(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template rather than raw path to keep cardinality bounded
+    route = request.scope.get("route")
+    REQUEST_DURATION.observe(
+        time.perf_counter() - start,
+        method=request.method,
+        route=getattr(route, "path", "unmatched"),
+        status=response.status_code
+    )
+    return response
+
+
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(chat.router, prefix="/api", tags=["chat"])
 @app.get("/")
@@ -29,4 +63,64 @@ async def root():
 @app.post("/clear-cache")
 async def clear_cache():
     get_settings.cache_clear()
-    return {"message": "Cache cleared"}
\ No newline at end of file
+    return {"message": "Cache cleared"}
+
+@app.post("/clear-cache/transcripts", dependencies=[Depends(AuthService.require_admin)])
+async def clear_transcript_cache(video_id: Optional[str] = None):
+    """
+    Invalidate a single cached transcript, or every cached transcript when no video_id is given.
+    """
+    await get_transcript_cache().invalidate(video_id)
+    return {"message": "Transcript cache cleared", "video_id": video_id}
+
+@app.post("/clear-cache/summaries", dependencies=[Depends(AuthService.require_admin)])
+async def clear_summary_cache(key: Optional[str] = None):
+    """
+    Invalidate a single cached summary, or every cached summary when no key is given.
+    Editing a prompt in utils/constants.py already changes the cache key.
+    """
+    await get_summary_cache().invalidate(key)
+    return {"message": "Summary cache cleared", "key": key}
+
+@app.post("/clear-cache/searches", dependencies=[Depends(AuthService.require_admin)])
+async def clear_search_cache():
+    get_search_cache().clear()
+    return {"message": "Search cache cleared"}
+
+def collect_cache_stats() -> Dict:
+    return {
+        "transcripts": get_transcript_cache().stats(),
+        "summaries": get_summary_cache().stats(),
+        "searches": get_search_cache().stats(),
+        "auth_tokens": token_cache.cache.stats()
+    }
+
+def cache_metrics() -> List[str]:
+    lines = [
+        "# HELP easywatch_cache_hit_ratio In-process hit ratio per cache.",
+        "# TYPE easywatch_cache_hit_ratio gauge"
+    ]
+    lookups = [
+        "# HELP easywatch_cache_lookups In-process lookups per cache and result.",
+        "# TYPE easywatch_cache_lookups gauge"
+    ]
+    for name, stats in collect_cache_stats().items():
+        memory = stats.get("memory", stats)
+        lines.append(f'easywatch_cache_hit_ratio{{cache="{name}"}} {memory["hit_ratio"]}')
+        lookups.append(f'easywatch_cache_lookups{{cache="{name}",result="hit"}} {memory["hits"]}')
+        lookups.append(f'easywatch_cache_lookups{{cache="{name}",result="miss"}} {memory["misses"]}')
+    return lines + lookups
+
+register_collector(cache_metrics)
+
+@app.get("/cache-stats", dependencies=[Depends(AuthService.require_admin)])
+async def cache_stats():
+    return collect_cache_stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus exposition: request and stage latency histograms, stage error
+    counters and cache hit ratios.
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
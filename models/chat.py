@@ -1,5 +1,5 @@
-from typing import Optional
-from pydantic import BaseModel
+from typing import List, Optional
+from pydantic import BaseModel, Field
 
 
 class ChatRequest(BaseModel):
@@ -13,3 +13,9 @@ class CollectionCreateRequest(BaseModel):
 
 class AddSessionToCollectionRequest(BaseModel):
     session_id: str
+
+class BatchChatRequest(BaseModel):
+    items: List[str] = Field(..., min_length=1, max_length=50)
+    session_id: str
+    tag: str = "general"
+    collection_id: Optional[str] = None
@@ -1,58 +1,192 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer
 from routes.auth import validate_token
-from models.chat import AddSessionToCollectionRequest, ChatRequest, CollectionCreateRequest
+from models.chat import AddSessionToCollectionRequest, BatchChatRequest, ChatRequest, CollectionCreateRequest
 from services.firestore_service import FirestoreService
+from services.job_service import get_job_runner
 from services.youtube_service import YoutubeService
-from starlette.status import HTTP_404_NOT_FOUND, HTTP_401_UNAUTHORIZED, HTTP_200_OK
+from starlette.status import HTTP_404_NOT_FOUND, HTTP_401_UNAUTHORIZED, HTTP_200_OK, HTTP_202_ACCEPTED
 
 
 
 router = APIRouter()
 security = HTTPBearer()
 
+async def get_user_id(token) -> str:
+    """
+    Guest tokens are used as the user id as-is; anything else must be a valid Firebase token.
+    """
+    if token.credentials.startswith("guest"):
+        return token.credentials
+    user = await validate_token(token)
+    return user["uid"]
+
 @router.post("/chat")
 async def analyze_finances(
     query: ChatRequest,
+    response: Response,
+    job: bool = False,
     token: str = Depends(security)
 ):
-    if token.credentials.startswith("guest"):
-        user_id = token.credentials
-    else:
-        user = await validate_token(token)
-        user_id = user["uid"]
+    """
+    Answer a chat prompt. With `?job=true` the work is queued instead and the
+    job record is returned immediately; poll GET /api/jobs/{job_id} for the result.
+    """
+    user_id = await get_user_id(token)
+
+    if job:
+        record = await get_job_runner().submit(
+            user_id=user_id, session_id=query.session_id, tag=query.tag, prompt=query.prompt
+        )
+        response.status_code = HTTP_202_ACCEPTED
+        return {"job_id": record["id"], "status": record["status"]}
 
     youtube_service = YoutubeService(session_id=query.session_id, user_id=user_id, tag=query.tag)
 
     result = await youtube_service.get_youtube_summary(query.prompt)
     return result
 
+def format_sse(event: str, data) -> str:
+    """
+    Serialise one Server-Sent Event. Data is JSON encoded so newlines in the
+    summary cannot break the event framing.
+    """
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@router.post("/chat/stream")
+async def stream_chat(
+    query: ChatRequest,
+    token: str = Depends(security)
+):
+    """
+    Same as /chat but streams the summary as Server-Sent Events:
+    `token` events carry text as it is generated, `done` carries the final result.
+    """
+    user_id = await get_user_id(token)
+
+    youtube_service = YoutubeService(session_id=query.session_id, user_id=user_id, tag=query.tag)
+
+    async def event_stream():
+        try:
+            async for event, data in youtube_service.stream_youtube_summary(query.prompt):
+                yield format_sse(event, data)
+        except Exception as e:
+            yield format_sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/chat/batch")
+async def batch_chat(
+    batch: BatchChatRequest,
+    token: str = Depends(security)
+):
+    """
+    Summarise a list of video URLs or ids into one session, streaming an `item`
+    Server-Sent Event per video as soon as it is ready and `done` at the end.
+    """
+    user_id = await get_user_id(token)
+
+    youtube_service = YoutubeService(session_id=batch.session_id, user_id=user_id, tag=batch.tag)
+
+    # Reject a missing or foreign collection before any summary is generated
+    if batch.collection_id:
+        await youtube_service.firestore.get_collection_for_user(batch.collection_id, user_id)
+
+    async def event_stream():
+        completed = 0
+        try:
+            async for result in youtube_service.summarize_videos(batch.items, batch.collection_id):
+                completed += 1
+                yield format_sse("item", result)
+            yield format_sse("done", {"session_id": batch.session_id, "completed": completed})
+        except Exception as e:
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            yield format_sse("error", {"detail": detail})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str, token: str = Depends(security)):
+    """
+    Report the status, current stage and (once finished) the result of a summary job.
+    """
+    user_id = await get_user_id(token)
+
+    record = await get_job_runner().get(job_id)
+    if record is None or record["user_id"] != user_id:
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Job not found")
+
+    return {
+        "job_id": record["id"],
+        "status": record["status"],
+        "stage": record["stage"],
+        "result": record["result"],
+        "error": record["error"],
+        "created_at": record["created_at"],
+        "updated_at": record["updated_at"]
+    }
+
 @router.get('/sessions')
 async def get_sessions(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    after: Optional[str] = None,
     token: str = Depends(security)
 ):           
-
+    """
+    List the user's sessions, most recently updated first. With `limit`, the
+    cursor of the next page is returned in the X-Next-Cursor header.
+    """
     user = await validate_token(token)
     user_id = user["uid"]
     firestore_service = FirestoreService()
 
-    result = await firestore_service.get_all_sessions_for_user(user_id=user_id)
+    result, next_cursor = await firestore_service.get_all_sessions_for_user(
+        user_id=user_id, limit=limit, after=after
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
     return result
 
 
 @router.get("/sessions/{session_id}/messages")
-async def get_session_messages(session_id: str, token: str = Depends(security)):
-
+async def get_session_messages(
+    session_id: str,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    after: Optional[str] = None,
+    token: str = Depends(security)
+):
+    """
+    List the messages of a session in order. With `limit`, the cursor of the
+    next page is returned in the X-Next-Cursor header.
+    """
     user = await validate_token(token)
     user_id = user["uid"]
 
     firestore_service = FirestoreService(session_id=session_id)
 
-    messages = await firestore_service.retrieve_messages(session_id=session_id, user_id=user_id)
+    messages, next_cursor = await firestore_service.retrieve_messages(
+        session_id=session_id, user_id=user_id, limit=limit, after=after
+    )
     
-    if not messages:
+    if not messages and after is None:
         raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Session not found or access denied")
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     
     return messages
 
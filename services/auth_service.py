@@ -1,31 +1,131 @@
-from firebase_admin import auth
 from fastapi import HTTPException, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional, Dict
-import requests
+import asyncio
+import hashlib
+import hmac
+import time
 from core.config import get_settings
+from core.container import get_container
+from core.http import get_http_client
+from core.metrics import timed
+from utils.cache import LRUCache
 
 settings = get_settings()
 security = HTTPBearer()
 
+# ID tokens live for at most an hour, so older revocations can be forgotten
+MAX_TOKEN_LIFETIME_SECONDS = 60 * 60
+
+
+class VerifiedTokenCache:
+    """
+    Bounded cache of verified ID token claims keyed by a hash of the token.
+
+    Entries expire at the token's `exp`. Logging out records a revocation time
+    for the user; cached or freshly verified tokens issued before it are refused.
+    """
+
+    def __init__(self, max_entries: int):
+        self.cache = LRUCache(max_entries=max_entries)
+        self.revoked_at: Dict[str, int] = {}
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[Dict]:
+        key = self._key(token)
+        claims = self.cache.get(key)
+        if claims is None:
+            return None
+        if self.is_revoked(claims):
+            self.cache.delete(key)
+            return None
+        return claims
+
+    def set(self, token: str, claims: Dict) -> None:
+        ttl = claims.get("exp", 0) - time.time()
+        if ttl > 0:
+            self.cache.set(self._key(token), claims, ttl=ttl)
+
+    def is_revoked(self, claims: Dict) -> bool:
+        revoked_at = self.revoked_at.get(claims.get("uid"))
+        return revoked_at is not None and claims.get("iat", 0) < revoked_at
+
+    def revoke(self, user_id: str) -> None:
+        now = int(time.time())
+        self.revoked_at = {
+            uid: revoked_at for uid, revoked_at in self.revoked_at.items()
+            if revoked_at > now - MAX_TOKEN_LIFETIME_SECONDS
+        }
+        self.revoked_at[user_id] = now
+
+
+token_cache = VerifiedTokenCache(max_entries=settings.AUTH_TOKEN_CACHE_MAX_ENTRIES)
+
+
 class AuthService:
     @staticmethod
+    @timed("auth.verify_token")
     async def verify_token(credentials: HTTPAuthorizationCredentials = Security(security)):
-        try:
-            decoded_token = auth.verify_id_token(credentials.credentials)
+        """
+        Verify a Firebase ID token, serving repeated checks of the same token from cache.
+        Signature verification (and the revocation lookup) runs in a worker thread.
+        """
+        token = credentials.credentials
+
+        decoded_token = token_cache.get(token)
+        if decoded_token is not None:
             return decoded_token
+
+        auth = get_container().auth
+        try:
+            decoded_token = await asyncio.to_thread(
+                auth.verify_id_token,
+                token,
+                check_revoked=settings.AUTH_CHECK_REVOKED
+            )
         except Exception as e:
             raise HTTPException(
                 status_code=401,
                 detail="Invalid authentication credentials"
             )
 
+        if token_cache.is_revoked(decoded_token):
+            raise HTTPException(
+                status_code=401,
+                detail="Invalid authentication credentials"
+            )
+
+        token_cache.set(token, decoded_token)
+        return decoded_token
+
+    @staticmethod
+    async def require_admin(credentials: HTTPAuthorizationCredentials = Security(security)):
+        """
+        Guard for operational endpoints: the bearer token must equal ADMIN_API_TOKEN.
+        They are disabled entirely while no admin token is configured.
+        """
+        admin_token = settings.ADMIN_API_TOKEN
+        if not admin_token:
+            raise HTTPException(
+                status_code=403,
+                detail="Admin endpoints are disabled"
+            )
+        if not hmac.compare_digest(credentials.credentials.encode("utf-8"), admin_token.encode("utf-8")):
+            raise HTTPException(
+                status_code=403,
+                detail="Invalid admin token"
+            )
+
     @staticmethod
+    @timed("auth.login_user")
     async def login_user(email: str, password: str) -> Dict:
         try:
             # Use Firebase Auth REST API to sign in with email/password
-            response = requests.post(
-                f"https://identitytoolkit.googleapis.com/v1/accounts:signInWithPassword?key={settings.FIREBASE_WEB_API_KEY}",
+            response = await get_http_client().post(
+                f"{settings.IDENTITY_TOOLKIT_URL}/accounts:signInWithPassword?key={settings.FIREBASE_WEB_API_KEY}",
                 json={
                     "email": email,
                     "password": password,
@@ -43,7 +143,7 @@ class AuthService:
             auth_data = response.json()
             
             # Get user profile information
-            user = auth.get_user(auth_data["localId"])
+            user = await asyncio.to_thread(get_container().auth.get_user, auth_data["localId"])
             
             return {
                 "message": "Login successful",
@@ -65,9 +165,10 @@ class AuthService:
 
     @staticmethod
     async def create_user(email: str, password: str, display_name: Optional[str] = None) -> Dict:
-
+        auth = get_container().auth
         try:
-            user = auth.create_user(
+            user = await asyncio.to_thread(
+                auth.create_user,
                 email=email,
                 password=password,
                 display_name=display_name
@@ -92,7 +193,8 @@ class AuthService:
     @staticmethod
     async def logout_user(user_id: str) -> Dict:
         try:
-            auth.revoke_refresh_tokens(user_id)
+            await asyncio.to_thread(get_container().auth.revoke_refresh_tokens, user_id)
+            token_cache.revoke(user_id)
             return {
                 "message": "Logged out successfully",
                 "user_id": user_id
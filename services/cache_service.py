@@ -0,0 +1,287 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from functools import lru_cache
+from typing import Any, Dict, Optional
+from core.config import get_settings
+from utils.cache import LRUCache
+
+
+class CacheBackend:
+    """
+    Persistent second tier behind the in-process LRU. Values must be JSON
+    serialisable dictionaries.
+    """
+
+    async def get(self, key: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Dict, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def clear(self) -> None:
+        raise NotImplementedError
+
+
+class FirestoreCacheBackend(CacheBackend):
+    """
+    Stores cache entries as documents of a Firestore collection, using the
+    cache key as the document id.
+    """
+
+    def __init__(self, collection: str, project_id: Optional[str] = None):
+        self.collection = collection
+        self.project_id = project_id
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            from google.cloud import firestore
+            self._client = firestore.AsyncClient(project=self.project_id)
+        return self._client
+
+    async def get(self, key: str) -> Optional[Dict]:
+        doc = await self.client.collection(self.collection).document(key).get()
+        if not doc.exists:
+            return None
+
+        data = doc.to_dict()
+        expires_at = data.get("expires_at")
+        if expires_at is not None and expires_at <= time.time():
+            return None
+        return data.get("value")
+
+    async def set(self, key: str, value: Dict, ttl: Optional[float] = None) -> None:
+        await self.client.collection(self.collection).document(key).set({
+            "value": value,
+            "cached_at": time.time(),
+            "expires_at": time.time() + ttl if ttl is not None else None
+        })
+
+    async def delete(self, key: str) -> None:
+        await self.client.collection(self.collection).document(key).delete()
+
+    async def clear(self) -> None:
+        async for doc in self.client.collection(self.collection).stream():
+            await doc.reference.delete()
+
+
+class LocalCacheBackend(CacheBackend):
+    """
+    Stores cache entries as JSON files in a local directory. Useful for single
+    node deployments and for running without Google credentials.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        filename = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{filename}.json")
+
+    def _read(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        expires_at = data.get("expires_at")
+        if expires_at is not None and expires_at <= time.time():
+            return None
+        return data.get("value")
+
+    def _write(self, key: str, value: Dict, ttl: Optional[float]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "key": key,
+                "value": value,
+                "cached_at": time.time(),
+                "expires_at": time.time() + ttl if ttl is not None else None
+            }, f)
+        os.replace(tmp_path, path)
+
+    def _delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _clear(self) -> None:
+        if not os.path.isdir(self.directory):
+            return
+        for filename in os.listdir(self.directory):
+            if filename.endswith(".json"):
+                os.remove(os.path.join(self.directory, filename))
+
+    async def get(self, key: str) -> Optional[Dict]:
+        return await asyncio.to_thread(self._read, key)
+
+    async def set(self, key: str, value: Dict, ttl: Optional[float] = None) -> None:
+        await asyncio.to_thread(self._write, key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._delete, key)
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._clear)
+
+
+class TieredCache:
+    """
+    Two-tier cache: an in-process LRU in front of an optional persistent backend.
+
+    Lookups check memory first, then the backend; backend hits are promoted
+    into memory. Failures in the backend are treated as misses so the cache can
+    never take down the request path.
+    """
+
+    def __init__(self, name: str, memory: LRUCache, backend: Optional[CacheBackend] = None, ttl: Optional[float] = None):
+        self.name = name
+        self.memory = memory
+        self.backend = backend
+        self.ttl = ttl
+        self.backend_hits = 0
+        self.backend_misses = 0
+        self.backend_errors = 0
+
+    async def get(self, key: str) -> Optional[Dict]:
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+
+        if self.backend is None:
+            return None
+
+        try:
+            value = await self.backend.get(key)
+        except Exception:
+            self.backend_errors += 1
+            return None
+
+        if value is None:
+            self.backend_misses += 1
+            return None
+
+        self.backend_hits += 1
+        self.memory.set(key, value)
+        return value
+
+    async def set(self, key: str, value: Dict) -> None:
+        self.memory.set(key, value)
+        if self.backend is None:
+            return
+        try:
+            await self.backend.set(key, value, ttl=self.ttl)
+        except Exception:
+            self.backend_errors += 1
+
+    async def invalidate(self, key: Optional[str] = None) -> None:
+        """
+        Drop a single entry from both tiers, or everything when no key is given.
+        """
+        if key is None:
+            self.memory.clear()
+            if self.backend is not None:
+                await self.backend.clear()
+            return
+
+        self.memory.delete(key)
+        if self.backend is not None:
+            await self.backend.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory": self.memory.stats(),
+            "persistent": {
+                "backend": type(self.backend).__name__ if self.backend else None,
+                "hits": self.backend_hits,
+                "misses": self.backend_misses,
+                "errors": self.backend_errors,
+            }
+        }
+
+
+def build_backend(kind: str, collection: str) -> Optional[CacheBackend]:
+    """
+    Create the persistent tier configured by `kind` ("firestore", "local" or "none").
+    """
+    settings = get_settings()
+    if kind == "firestore":
+        return FirestoreCacheBackend(collection=collection, project_id=settings.PROJECT_ID)
+    if kind == "local":
+        return LocalCacheBackend(directory=os.path.join(settings.CACHE_DIR, collection))
+    return None
+
+
+@lru_cache()
+def get_transcript_cache() -> TieredCache:
+    """
+    Process wide transcript cache keyed by video_id.
+    """
+    settings = get_settings()
+    return TieredCache(
+        name="transcripts",
+        memory=LRUCache(
+            max_entries=settings.TRANSCRIPT_CACHE_MAX_ENTRIES,
+            max_bytes=settings.TRANSCRIPT_CACHE_MAX_BYTES,
+            ttl=settings.TRANSCRIPT_CACHE_TTL_SECONDS
+        ),
+        backend=build_backend(settings.TRANSCRIPT_CACHE_BACKEND, "transcripts"),
+        ttl=settings.TRANSCRIPT_CACHE_TTL_SECONDS
+    )
+
+
+@lru_cache()
+def get_search_cache() -> LRUCache:
+    """
+    In-process cache of YouTube search results keyed by normalised query.
+    """
+    settings = get_settings()
+    return LRUCache(
+        max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+        ttl=settings.SEARCH_CACHE_TTL_SECONDS
+    )
+
+
+def normalize_query(query: str) -> str:
+    """
+    Case-fold and collapse whitespace so trivially different queries share an entry.
+    """
+    return " ".join(query.casefold().split())
+
+
+@lru_cache()
+def get_summary_cache() -> TieredCache:
+    """
+    Process wide cache of generated video summaries, shared across users.
+    """
+    settings = get_settings()
+    return TieredCache(
+        name="summaries",
+        memory=LRUCache(
+            max_entries=settings.SUMMARY_CACHE_MAX_ENTRIES,
+            max_bytes=settings.SUMMARY_CACHE_MAX_BYTES,
+            ttl=settings.SUMMARY_CACHE_TTL_SECONDS
+        ),
+        backend=build_backend(settings.SUMMARY_CACHE_BACKEND, "summaries"),
+        ttl=settings.SUMMARY_CACHE_TTL_SECONDS
+    )
+
+
+def summary_cache_key(video_id: str, prompt: str, model: str, prompt_version: str = "") -> str:
+    """
+    Content address of a summary: the video, the model and a hash of the prompt
+    (plus its version tag), so editing a prompt naturally misses old entries.
+    """
+    prompt_hash = hashlib.sha256(f"{prompt_version}\n{prompt}".encode("utf-8")).hexdigest()[:16]
+    return f"{video_id}:{model}:{prompt_hash}"
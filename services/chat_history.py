@@ -0,0 +1,138 @@
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from google.cloud import firestore
+
+
+HUMAN = "human"
+AI = "ai"
+
+
+def _decode_legacy_message(raw) -> Optional[Dict]:
+    """
+    Decode a message written by langchain_google_firestore, which stored the
+    whole history as a `messages` array of encoded `message_to_dict` payloads.
+    """
+    if isinstance(raw, (bytes, str)):
+        try:
+            raw = json.loads(raw)
+        except ValueError:
+            return None
+    if not isinstance(raw, dict):
+        return None
+
+    data = raw.get("data", raw)
+    return {
+        "id": data.get("id"),
+        "type": raw.get("type"),
+        "content": data.get("content", ""),
+        "seq": None,
+        "created_at": None
+    }
+
+
+class AsyncFirestoreChatMessageHistory:
+    """
+    Async replacement for langchain's FirestoreChatMessageHistory.
+
+    Each message is its own document under `{collection}/{session_id}/messages`
+    ordered by a `seq` field, so histories can grow without rewriting one
+    ever larger document and every call goes through `firestore.AsyncClient`.
+    """
+
+    def __init__(self, session_id: str, client: firestore.AsyncClient, collection: str = "chat_history"):
+        self.session_id = session_id
+        self.client = client
+        self.session_ref = client.collection(collection).document(session_id)
+        self.messages_ref = self.session_ref.collection("messages")
+
+    def add_turn_to_batch(self, batch, message: str, response: str) -> None:
+        """
+        Queue a user message and its AI response on a WriteBatch so the whole
+        turn is committed together with any other writes on the batch.
+        """
+        seq = time.time_ns()
+        created_at = datetime.utcnow()
+        for offset, (message_type, content) in enumerate(((HUMAN, message), (AI, response))):
+            batch.set(self.messages_ref.document(), {
+                "type": message_type,
+                "content": content,
+                "seq": seq + offset,
+                "created_at": created_at
+            })
+
+    async def _get_seq_messages(self, query) -> List[Dict]:
+        messages = []
+        async for doc in query.stream():
+            data = doc.to_dict()
+            data["id"] = doc.id
+            messages.append(data)
+        return messages
+
+    async def get_messages(self, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Return the messages of the session, oldest first.
+
+        Sessions written before the move to message documents keep their older
+        history in the legacy `messages` array; it comes before any message
+        documents. When `limit` is given only the newest `limit` message
+        documents are read, using a descending `seq` query, and the legacy
+        document is only read when they do not fill the window.
+        """
+        if limit is None:
+            legacy_messages, messages = await asyncio.gather(
+                self._get_legacy_messages(), self._get_seq_messages(self.messages_ref.order_by("seq"))
+            )
+            return legacy_messages + messages
+
+        query = self.messages_ref.order_by("seq", direction=firestore.Query.DESCENDING).limit(limit)
+        messages = (await self._get_seq_messages(query))[::-1]
+        missing = limit - len(messages)
+        if missing > 0:
+            legacy_messages = await self._get_legacy_messages()
+            if legacy_messages:
+                messages = legacy_messages[-missing:] + messages
+        return messages
+
+    async def get_page(self, limit: int, after: Optional[Dict] = None) -> Tuple[List[Dict], Optional[Dict]]:
+        """
+        Return up to `limit` messages oldest first, starting after the position
+        `after`, together with the position to continue from (None on the last page).
+
+        The legacy array is paged first with `{"offset": ...}` positions, then the
+        message documents with `{"seq": ...}` positions.
+        """
+        after = after or {}
+
+        messages = []
+        query = self.messages_ref.order_by("seq")
+        if "seq" in after:
+            query = query.start_after({"seq": after["seq"]})
+        else:
+            legacy_messages = await self._get_legacy_messages()
+            offset = after.get("offset", 0)
+            messages = legacy_messages[offset:offset + limit]
+            if offset + limit < len(legacy_messages):
+                return messages, {"offset": offset + limit}
+
+        # Read one extra document to know whether another page exists
+        remaining = limit - len(messages)
+        seq_messages = await self._get_seq_messages(query.limit(remaining + 1))
+        if len(seq_messages) <= remaining:
+            return messages + seq_messages, None
+
+        seq_messages = seq_messages[:remaining]
+        if seq_messages:
+            return messages + seq_messages, {"seq": seq_messages[-1]["seq"]}
+        # The page ended exactly at the end of the legacy array
+        return messages, {"offset": offset + len(messages)}
+
+    async def _get_legacy_messages(self) -> List[Dict]:
+        doc = await self.session_ref.get()
+        if not doc.exists:
+            return []
+
+        decoded = (_decode_legacy_message(raw) for raw in doc.to_dict().get("messages", []))
+        return [message for message in decoded if message is not None]
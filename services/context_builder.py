@@ -0,0 +1,53 @@
+from typing import Dict, List, Optional
+from core.config import get_settings
+from utils.tokens import estimate_tokens, truncate_to_tokens
+
+
+class ContextBuilder:
+    """
+    Turns stored conversation turns into a compact "Past Conversations" block
+    that fits a token budget.
+
+    The newest `recent_turns` turns are kept verbatim when they fit; older
+    responses (usually long video summaries) are cut to `compact_tokens`.
+    Turns are added newest first until the budget is spent, then emitted in
+    chronological order as plain "User:/Assistant:" lines.
+    """
+
+    def __init__(self):
+        settings = get_settings()
+        self.max_tokens = settings.CONTEXT_MAX_TOKENS
+        self.recent_turns = settings.CONTEXT_RECENT_TURNS
+        self.compact_tokens = settings.CONTEXT_COMPACT_TOKENS
+
+    def _format_turn(self, conversation: Dict, max_response_tokens: Optional[int]) -> str:
+        lines = [f"User: {conversation['message'].strip()}"]
+        response = (conversation.get("response") or "").strip()
+        if response:
+            if max_response_tokens is not None:
+                response = truncate_to_tokens(response, max_response_tokens)
+            lines.append(f"Assistant: {response}")
+        return "\n".join(lines)
+
+    def build(self, conversations: List[Dict], max_tokens: Optional[int] = None) -> str:
+        """
+        `conversations` are {'message', 'response'} dicts, oldest first.
+        """
+        budget = self.max_tokens if max_tokens is None else max_tokens
+        turns = []
+
+        for age, conversation in enumerate(reversed(conversations)):
+            if budget <= 0:
+                break
+
+            turn = self._format_turn(conversation, None if age < self.recent_turns else self.compact_tokens)
+            cost = estimate_tokens(turn)
+            if cost > budget:
+                # Keep what fits of the turn rather than dropping it entirely
+                turn = truncate_to_tokens(turn, budget)
+                cost = budget
+
+            turns.append(turn)
+            budget -= cost
+
+        return "\n".join(reversed(turns))
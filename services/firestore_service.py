@@ -1,17 +1,34 @@
 from fastapi import HTTPException
-from langchain_google_firestore import FirestoreChatMessageHistory
-from dotenv import load_dotenv
-import os
-from typing import Dict, List, Optional
-from google.cloud import firestore
+import asyncio
+import base64
+import binascii
+import json
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
-from starlette.status import HTTP_404_NOT_FOUND, HTTP_401_UNAUTHORIZED
+from starlette.status import HTTP_400_BAD_REQUEST, HTTP_404_NOT_FOUND, HTTP_401_UNAUTHORIZED
+from core.metrics import timed
+from services.storage import InvalidCursor, StorageBackend, get_storage
+
+def encode_cursor(position: Optional[Dict]) -> Optional[str]:
+    """
+    Turn a query position into an opaque, URL safe pagination token.
+    """
+    if position is None:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(position).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Dict]:
+    if cursor is None:
+        return None
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, binascii.Error):
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    if not isinstance(position, dict):
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return position
 
-load_dotenv()
-
-PROJECT_ID = os.getenv("PROJECT_ID")
-COLLECTION_NAME = "chat_history"
-client = firestore.Client(project=PROJECT_ID)
 
 class FirestoreService:
     def __init__(self, session_id: str = "general", tag: str = "general"):
@@ -20,48 +37,33 @@ class FirestoreService:
         
         The session_id is used for storing messages in the chat history,
         and later combined with the user_id to record session details.
+        Reads and writes go through the configured storage backend
+        (see services/storage).
         """
-        self.project_id = PROJECT_ID
-        self.collection_name = COLLECTION_NAME
         self.session_id = session_id
         self.tag = tag
 
-    def get_chat_history(self) -> FirestoreChatMessageHistory:
-        """
-        Retrieve the chat history using the session ID.
-        """
-        return FirestoreChatMessageHistory(
-            session_id=self.session_id,
-            client=client,
-            collection=self.collection_name
-        )
+    @property
+    def storage(self) -> StorageBackend:
+        return get_storage()
 
+    @timed("storage.store_conversation")
     async def store_conversation(self, user_id: str, message: str, response: str="") -> None:
         """
         Store a conversation in Firestore and update the sessions collection.
 
-        This method stores the conversation using langchain_google_firestore,
-        then records (or updates) the session information in the "sessions" collection
+        This method stores the conversation in the session's chat history and
+        records (or updates) the session information in the "sessions" collection
         using the session_id as the document id, and storing the user_id and tag.
+        Both are written together, so a turn costs one commit.
         """
-        chat_history = self.get_chat_history()
-        
-
-        chat_history.add_user_message(message)
-        chat_history.add_ai_message(response)
-
-        session_data = {
-            "user_id": user_id,
-            "tag": self.tag,
-            "updated_at": datetime.utcnow()
-        }
-
+        title = None
         if not getattr(self, "session_title", None):
-            self.session_title = message
-            session_data["title"] = self.session_title
+            self.session_title = title = message
 
-        client.collection("sessions").document(self.session_id).set(session_data, merge=True)
+        await self.storage.save_turn(self.session_id, user_id, self.tag, message, response, title=title)
 
+    @timed("storage.get_user_conversations")
     async def get_user_conversations(self, limit: int = 10) -> List[Dict]:
         """
         Retrieve recent conversations for this session.
@@ -69,25 +71,31 @@ class FirestoreService:
         Note: This method assumes that messages are stored in pairs (user and AI)
         and retrieves the last `limit` messages from the history.
         """
-        chat_history = self.get_chat_history()
-        
         # Get the last N messages from chat history
-        messages = chat_history.messages[-limit:]
+        messages = await self.storage.get_messages(self.session_id, limit=limit)
         conversations = []
         
         # Process messages in pairs (user message followed by AI response)
         for i in range(0, len(messages), 2):
             if i + 1 < len(messages):
                 conversations.append({
-                    'message': messages[i].content,
-                    'response': messages[i + 1].content,
+                    'message': messages[i]["content"],
+                    'response': messages[i + 1]["content"],
                     'timestamp': datetime.now()
                 })
         
         return conversations
     
 
-    async def retrieve_messages(self, session_id: str, user_id: str, tag: Optional[str] = None) -> List[Dict]:
+    @timed("storage.retrieve_messages")
+    async def retrieve_messages(
+        self,
+        session_id: str,
+        user_id: str,
+        tag: Optional[str] = None,
+        limit: Optional[int] = None,
+        after: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
         """
         Retrieve messages for a given session if the session document matches the
         provided user_id and (if given) tag.
@@ -98,115 +106,126 @@ class FirestoreService:
           3. If a tag is provided, verifies that the document's tag matches.
           4. If all checks pass, retrieves the chat messages from the "chat_history" collection.
           
+        When `limit` is given, messages are returned in pages of at most `limit`
+        entries in message order; `after` is the cursor returned with the previous page.
+
         Returns:
           A list of dictionaries, each representing a chat message with its content,
-          role, and a placeholder for the timestamp.
+          role, and a placeholder for the timestamp, and the cursor of the next page
+          (None when there are no more messages).
         """
-        session_doc = client.collection("sessions").document(session_id).get()
-        if not session_doc.exists:
-            return []
-
-        session_data = session_doc.to_dict()
+        position = decode_cursor(after)
 
+        session_data = await self.storage.get_session(session_id)
+        if session_data is None:
+            return [], None
 
         if session_data.get("user_id") != user_id:
-            return []
+            return [], None
 
         if tag is not None and session_data.get("tag") != tag:
-            return []
+            return [], None
 
-        chat_history = FirestoreChatMessageHistory(
-            session_id=session_id,
-            client=client,
-            collection=self.collection_name
-        )
+        next_position = None
+        if limit is None:
+            messages = await self.storage.get_messages(session_id)
+        else:
+            # Keep user/assistant pairs on the same page
+            messages, next_position = await self.storage.get_messages_page(session_id, limit + limit % 2, position)
 
         # Convert messages to a list of dictionaries
         messages_list = []
         
-        for i in range(0, len(chat_history.messages), 2):
-            if i + 1 < len(chat_history.messages):
+        for i in range(0, len(messages), 2):
+            if i + 1 < len(messages):
                 messages_list.append({
-                    "id": chat_history.messages[i].id,
+                    "id": messages[i]["id"],
                     "role": "user",
-                    "content": chat_history.messages[i].content,
+                    "content": messages[i]["content"],
                     'timestamp': datetime.now()
                 })
 
                 messages_list.append({
                     "role": "system",
-                    "content": chat_history.messages[i + 1].content.strip() or "You didn't retrieve a summary, use another chat.",
+                    "content": messages[i + 1]["content"].strip() or "You didn't retrieve a summary, use another chat.",
                     'timestamp': datetime.now()
                 })
 
-        return messages_list
+        return messages_list, encode_cursor(next_position)
     
 
-    async def get_all_sessions_for_user(self, user_id: str) -> List[Dict]:
+    @timed("storage.get_all_sessions_for_user")
+    async def get_all_sessions_for_user(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        after: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
         """
-        Retrieve all session documents from the "sessions" collection for a given user_id.
+        Retrieve the sessions of a given user_id, most recently updated first.
+
+        Returns a list of dictionaries containing session details. Collection membership
+        is resolved from the user's collections, fetched once alongside the sessions.
 
-        This method queries Firestore for all sessions associated with the provided user_id
-        and returns a list of dictionaries containing session details.
+        When `limit` is given at most `limit` sessions are returned; pass the returned
+        cursor as `after` to read the next page. On Firestore this requires the
+        (user_id, updated_at DESC) composite index from firestore.indexes.json.
         """
-        sessions_ref = client.collection("sessions")
-        query = sessions_ref.where("user_id", "==", user_id)
-        docs = query.stream()
-        sessions = []
-        for doc in docs:
-            data = doc.to_dict()
-            data["id"] = doc.id
-            query = client.collection("collections").where("sessions", "array_contains", data["id"])
-            results = query.stream()
-            collection_ids = [doc.id for doc in results]
-            if collection_ids:
-                data["collection_id"] = collection_ids[0]
-            else:
-                data["collection_id"] = None
-            sessions.append(data)
-        return sessions
+        position = decode_cursor(after)
+
+        async def list_sessions() -> Tuple[List[Dict], Optional[Dict]]:
+            try:
+                return await self.storage.list_sessions(user_id, limit=limit, after=position)
+            except InvalidCursor:
+                raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+        (sessions, next_position), collections = await asyncio.gather(
+            list_sessions(),
+            self.get_collections_for_user(user_id=user_id)
+        )
+
+        collection_by_session = {}
+        for collection in collections:
+            for session_id in collection.get("sessions", []):
+                collection_by_session.setdefault(session_id, collection["id"])
+
+        for data in sessions:
+            data["collection_id"] = collection_by_session.get(data["id"])
+        return sessions, encode_cursor(next_position)
 
 
+    @timed("storage.create_collection_record")
     async def create_collection_record(self, user_id: str, name: str, color: str) -> Dict:
         """
-        Create a new collection record in the "collections" collection tied to the given user_id.
-        """
-        record_data = {
-            "name": name,
-            "color": color,
-            "user_id": user_id,
-            "created_at": datetime.utcnow()
-        }
-        # Create a new document with an auto-generated ID in the "collections" collection
-        doc_ref = client.collection("collections").document()
-        doc_ref.set(record_data)
-        return {"id": doc_ref.id, **record_data}
+        Create a new collection record tied to the given user_id.
+        """
+        return await self.storage.create_collection(user_id, name, color)
     
 
+    @timed("storage.get_collections_for_user")
     async def get_collections_for_user(self, user_id: str) -> List[Dict]:
         """
-        Retrieve all collection records from the "collections" collection for a given user_id.
-        """
-        collections_ref = client.collection("collections")
-        query = collections_ref.where("user_id", "==", user_id)
-        docs = query.stream()
-        collections = []
-        for doc in docs:
-            data = doc.to_dict()
-            data["id"] = doc.id
-            collections.append(data)
-        return collections
+        Retrieve all collection records for a given user_id.
+        """
+        return await self.storage.list_collections(user_id)
     
 
-    async def add_session_to_collection(self, collection_id: str, session_id: str, user_id: str) -> Dict:
-        collection_ref = client.collection("collections").document(collection_id)
-        doc_snapshot = collection_ref.get()
-        if not doc_snapshot.exists:
+    @timed("storage.get_collection_for_user")
+    async def get_collection_for_user(self, collection_id: str, user_id: str) -> Dict:
+        """
+        Retrieve a collection, raising 404 if it does not exist and 401 if it
+        belongs to another user.
+        """
+        data = await self.storage.get_collection(collection_id)
+        if data is None:
             raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Collection not found")
 
-        data = doc_snapshot.to_dict()
         if data.get("user_id") != user_id:
             raise HTTPException(status_code=HTTP_401_UNAUTHORIZED, detail="Access denied")
+        return data
 
-        collection_ref.update({"sessions": firestore.ArrayUnion([session_id])})
+    @timed("storage.add_session_to_collection")
+    async def add_session_to_collection(self, collection_id: str, session_id: str, user_id: str) -> Dict:
+        await self.get_collection_for_user(collection_id, user_id)
+        await self.storage.add_session_to_collection(collection_id, session_id)
         return {"message": "Session added to collection", "collection_id": collection_id, "session_id": session_id}
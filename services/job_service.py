@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import time
+import uuid
+from functools import lru_cache
+from typing import Dict, List, Optional
+from fastapi import HTTPException
+from starlette.status import HTTP_503_SERVICE_UNAVAILABLE
+from core.config import get_settings
+from services.youtube_service import YoutubeService
+
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class JobStore:
+    """
+    Storage for summary job records. Implementations must be safe to call
+    from several worker tasks.
+    """
+
+    async def create(self, job: Dict) -> None:
+        raise NotImplementedError
+
+    async def update(self, job_id: str, **fields) -> None:
+        raise NotImplementedError
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+
+class InMemoryJobStore(JobStore):
+    """
+    Process local job store. Finished jobs are dropped after `ttl` seconds.
+    """
+
+    def __init__(self, ttl: float = 60 * 60):
+        self.ttl = ttl
+        self._jobs: Dict[str, Dict] = {}
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job["status"] in (SUCCEEDED, FAILED) and job["updated_at"] < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    async def create(self, job: Dict) -> None:
+        self._prune()
+        self._jobs[job["id"]] = dict(job)
+
+    async def update(self, job_id: str, **fields) -> None:
+        if job_id in self._jobs:
+            self._jobs[job_id].update(fields)
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        job = self._jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+
+class FirestoreJobStore(JobStore):
+    """
+    Stores job records in the Firestore "jobs" collection so status survives
+    restarts and can be read from any instance.
+    """
+
+    def __init__(self, collection: str = "jobs", project_id: Optional[str] = None):
+        self.collection = collection
+        self.project_id = project_id
+        self._client = None
+
+    @property
+    def _collection_ref(self):
+        if self._client is None:
+            from google.cloud import firestore
+            self._client = firestore.AsyncClient(project=self.project_id)
+        return self._client.collection(self.collection)
+
+    async def create(self, job: Dict) -> None:
+        await self._collection_ref.document(job["id"]).set(job)
+
+    async def update(self, job_id: str, **fields) -> None:
+        await self._collection_ref.document(job_id).set(fields, merge=True)
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        doc = await self._collection_ref.document(job_id).get()
+        return doc.to_dict() if doc.exists else None
+
+
+class JobRunner:
+    """
+    Runs summary requests in the background on a bounded pool of worker tasks.
+
+    `submit` only enqueues the job and returns its record, so HTTP requests are
+    not held open for the search, transcript and LLM chain, and at most
+    `workers` summaries run at the same time.
+    """
+
+    def __init__(self, store: JobStore, workers: int = 4, queue_size: int = 100):
+        self.store = store
+        self.workers = workers
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        # Queue slots held by submits whose job record is still being written
+        self._reserved = 0
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, user_id: str, session_id: str, tag: str, prompt: str) -> Dict:
+        # Check and reserve with no await in between, so concurrent submits cannot overfill the queue
+        if self.queue.maxsize and self.queue.qsize() + self._reserved >= self.queue.maxsize:
+            raise HTTPException(status_code=HTTP_503_SERVICE_UNAVAILABLE, detail="Too many pending jobs, try again later")
+
+        now = time.time()
+        job = {
+            "id": uuid.uuid4().hex,
+            "user_id": user_id,
+            "session_id": session_id,
+            "tag": tag,
+            "prompt": prompt,
+            "status": QUEUED,
+            "stage": None,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now
+        }
+        self._reserved += 1
+        try:
+            await self.store.create(job)
+        finally:
+            self._reserved -= 1
+        self.queue.put_nowait(job)
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        return await self.store.get(job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self.queue.get()
+            try:
+                await self._run(job)
+            except Exception:
+                # A job store failure must not take the worker down with it
+                logger.exception("Job %s could not be run", job["id"])
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, job: Dict) -> None:
+        job_id = job["id"]
+
+        async def report(stage: str) -> None:
+            await self.store.update(job_id, stage=stage, updated_at=time.time())
+
+        try:
+            await self.store.update(job_id, status=RUNNING, updated_at=time.time())
+            youtube_service = YoutubeService(session_id=job["session_id"], user_id=job["user_id"], tag=job["tag"])
+            result = await youtube_service.get_youtube_summary(job["prompt"], progress=report)
+            await self.store.update(job_id, status=SUCCEEDED, stage=None, result=result, updated_at=time.time())
+        except Exception as e:
+            await self.store.update(job_id, status=FAILED, error=str(e), updated_at=time.time())
+
+
+@lru_cache()
+def get_job_runner() -> JobRunner:
+    settings = get_settings()
+    if settings.JOB_STORE_BACKEND == "firestore":
+        store = FirestoreJobStore(project_id=settings.PROJECT_ID)
+    else:
+        store = InMemoryJobStore(ttl=settings.JOB_TTL_SECONDS)
+    return JobRunner(store=store, workers=settings.JOB_WORKERS, queue_size=settings.JOB_QUEUE_SIZE)
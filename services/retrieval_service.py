@@ -0,0 +1,255 @@
+import asyncio
+import hashlib
+import os
+import time
+import weakref
+from functools import lru_cache
+from typing import Dict, List, Optional, Set
+from core.config import get_settings
+from core.container import get_container
+from core.metrics import timed
+from services.tools import extract_video_id, format_timestamp, get_cached_transcript_record
+from utils.cache import LRUCache
+from utils.singleflight import SingleFlight
+from utils.tokens import estimate_tokens
+from utils.transcript_codec import CompressedTranscript
+from utils.vector_index import VectorIndex
+
+
+# Inputs per embedding request accepted by the Gemini API
+EMBED_BATCH_SIZE = 100
+# Minimum time between two clean-ups of the index directory
+PRUNE_INTERVAL_SECONDS = 10 * 60
+# Temp files this old were left by an interrupted save rather than one in progress
+STALE_TEMP_SECONDS = 60 * 60
+
+
+def chunk_segments(segments: List[Dict], max_tokens: int) -> List[Dict]:
+    """
+    Group consecutive transcript segments into chunks of about `max_tokens`,
+    each keeping the start time of its first segment.
+    """
+    chunks, texts, tokens, start = [], [], 0, 0.0
+    for segment in segments:
+        if not texts:
+            start = segment["start"]
+        texts.append(segment["text"])
+        tokens += estimate_tokens(segment["text"])
+        if tokens >= max_tokens:
+            chunks.append({"start": start, "text": " ".join(texts)})
+            texts, tokens = [], 0
+    if texts:
+        chunks.append({"start": start, "text": " ".join(texts)})
+    return chunks
+
+
+class RetrievalService:
+    """
+    Per-session vector index of the transcripts a session has fetched, used to
+    ground follow-up questions without re-sending whole transcripts or summaries.
+
+    Transcripts are chunked and embedded in the background once a session has
+    summarised a video, from the cached transcript only. Each session's index
+    is a brute-force VectorIndex kept in a bounded in-process LRU and persisted
+    as an .npz file under `directory`, so it survives restarts and eviction.
+    Files not updated for `ttl` seconds are removed, and the oldest go first
+    once the directory grows past `max_bytes`.
+    """
+
+    def __init__(self, client, model: str, directory: str, max_sessions: int = 256,
+                 chunk_tokens: int = 250, top_k: int = 4, min_score: float = 0.3,
+                 ttl: Optional[float] = None, max_bytes: Optional[int] = None):
+        self.client = client
+        self.model = model
+        self.directory = directory
+        self.chunk_tokens = chunk_tokens
+        self.top_k = top_k
+        self.min_score = min_score
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.indexes = LRUCache(max_entries=max_sessions, ttl=ttl)
+        self.flights = SingleFlight()
+        self._tasks: Set[asyncio.Task] = set()
+        self._pruned_at = 0.0
+        # One lock per session being saved; entries go away once no save holds them
+        self._save_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    def _path(self, session_id: str) -> str:
+        filename = hashlib.sha256(session_id.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{filename}.npz")
+
+    def _prune(self) -> None:
+        """
+        Remove expired index files, then the least recently written ones until
+        the directory fits in `max_bytes`. Temp files of saves in progress are
+        left alone; only stale ones are removed.
+        """
+        try:
+            filenames = os.listdir(self.directory)
+        except FileNotFoundError:
+            return
+
+        now = time.time()
+        files = []
+        for name in filenames:
+            is_temp = name.endswith(".tmp")
+            if not (is_temp or name.endswith(".npz")):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+                if is_temp:
+                    if stat.st_mtime < now - STALE_TEMP_SECONDS:
+                        os.remove(path)
+                    continue
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+
+        total = sum(size for _, size, _ in files)
+        for modified_at, size, path in files:
+            expired = self.ttl is not None and modified_at < now - self.ttl
+            oversized = self.max_bytes is not None and total > self.max_bytes
+            if not (expired or oversized):
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    async def _maybe_prune(self) -> None:
+        if self._pruned_at and time.monotonic() - self._pruned_at < PRUNE_INTERVAL_SECONDS:
+            return
+        self._pruned_at = time.monotonic()
+        await asyncio.to_thread(self._prune)
+
+    async def _save(self, session_id: str, session_index: VectorIndex) -> None:
+        """
+        Persist a session's index. Saves of one session run one at a time, each
+        taking its snapshot once it holds the lock, so the last write is the newest.
+        """
+        lock = self._save_locks.get(session_id)
+        if lock is None:
+            lock = self._save_locks[session_id] = asyncio.Lock()
+
+        async with lock:
+            # Save a snapshot so later additions cannot change it mid-write
+            snapshot = VectorIndex(session_index.vectors, list(session_index.metadata))
+            await asyncio.to_thread(snapshot.save, self._path(session_id))
+
+    async def get_index(self, session_id: str) -> VectorIndex:
+        index = self.indexes.get(session_id)
+        if index is not None:
+            return index
+
+        async def load() -> VectorIndex:
+            loaded = await asyncio.to_thread(VectorIndex.load, self._path(session_id))
+            self.indexes.set(session_id, loaded)
+            return loaded
+
+        # Concurrent loads must share one object so no additions are lost
+        return await self.flights.do(("load", session_id), load)
+
+    async def _embed(self, texts: List[str], task_type: str) -> List[List[float]]:
+        from google.genai import types
+
+        config = types.EmbedContentConfig(task_type=task_type)
+
+        async def embed_batch(batch: List[str]) -> List[List[float]]:
+            response = await self.client.aio.models.embed_content(model=self.model, contents=batch, config=config)
+            return [embedding.values for embedding in response.embeddings]
+
+        batches = await asyncio.gather(*(
+            embed_batch(texts[start:start + EMBED_BATCH_SIZE])
+            for start in range(0, len(texts), EMBED_BATCH_SIZE)
+        ))
+        return [vector for batch in batches for vector in batch]
+
+    async def index_video(self, session_id: str, youtube_url: str) -> None:
+        """
+        Add a video's transcript to the session's index, unless it is already there.
+        Only a cached transcript is indexed; this never fetches one.
+        """
+        video_id = extract_video_id(youtube_url)
+        if not video_id:
+            return
+
+        async def index() -> None:
+            session_index = await self.get_index(session_id)
+            if any(item["video_id"] == video_id for item in session_index.metadata):
+                return
+
+            async with timed("retrieval.index"):
+                record = await get_cached_transcript_record(youtube_url)
+                if not record:
+                    return
+
+                transcript = CompressedTranscript.from_dict(record["transcript"])
+                chunks = chunk_segments(transcript.segments(), self.chunk_tokens)
+                if not chunks:
+                    return
+
+                title = record.get("title", "")
+                vectors = await self._embed([f"{title}\n{chunk['text']}" for chunk in chunks], "RETRIEVAL_DOCUMENT")
+                session_index.add(vectors, [
+                    {"video_id": video_id, "title": title, "start": chunk["start"], "text": chunk["text"]}
+                    for chunk in chunks
+                ])
+
+                await self._save(session_id, session_index)
+
+            await self._maybe_prune()
+
+        await self.flights.do(("index", session_id, video_id), index)
+
+    def schedule_index(self, session_id: str, youtube_url: str) -> None:
+        """
+        Index a video in the background; the request that fetched it does not wait.
+        """
+        async def run() -> None:
+            try:
+                await self.index_video(session_id, youtube_url)
+            except Exception:
+                # Counted in easywatch_stage_errors_total; retrieval is best effort
+                pass
+
+        task = asyncio.create_task(run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def search(self, session_id: str, query: str) -> List[Dict]:
+        """
+        Return the session's transcript chunks most relevant to `query`, best first.
+        """
+        session_index = await self.get_index(session_id)
+        if len(session_index) == 0:
+            return []
+
+        async with timed("retrieval.search"):
+            [vector] = await self._embed([query], "RETRIEVAL_QUERY")
+            return session_index.search(vector, k=self.top_k, min_score=self.min_score)
+
+    @staticmethod
+    def format_excerpts(chunks: List[Dict]) -> str:
+        return "\n".join(
+            f"[{chunk['title']} at {format_timestamp(chunk['start'])}] {chunk['text']}"
+            for chunk in chunks
+        )
+
+
+@lru_cache()
+def get_retrieval_service() -> RetrievalService:
+    settings = get_settings()
+    return RetrievalService(
+        client=get_container().gemini,
+        model=settings.EMBEDDING_MODEL,
+        directory=os.path.join(settings.CACHE_DIR, "vectors"),
+        max_sessions=settings.VECTOR_INDEX_MAX_SESSIONS,
+        chunk_tokens=settings.RETRIEVAL_CHUNK_TOKENS,
+        top_k=settings.RETRIEVAL_TOP_K,
+        min_score=settings.RETRIEVAL_MIN_SCORE,
+        ttl=settings.VECTOR_INDEX_TTL_SECONDS,
+        max_bytes=settings.VECTOR_INDEX_MAX_BYTES
+    )
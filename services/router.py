@@ -0,0 +1,82 @@
+import re
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from google.genai import types
+
+
+URL_PATTERN = re.compile(
+    r"(?:https?://)?(?:www\.|m\.|music\.)?"
+    r"(?:youtube\.com/(?:watch\?\S*?v=|shorts/|embed/|live/)|youtu\.be/)[\w-]+\S*",
+    re.IGNORECASE
+)
+
+# Filler that may surround a bare URL without changing what the user wants
+SUMMARY_FILLER_PATTERN = re.compile(
+    r"^(?:(?:please|can you|could you|pls)\s+)?"
+    r"(?:(?:summari[sz]e|summary(?:\s+of)?|tl;?dr|explain|recap|what\s+happens(?:\s+in)?)"
+    r"(?:\s+(?:this|the|that))?(?:\s+(?:video|part|section))?)?"
+    r"[\s:,.!?-]*$",
+    re.IGNORECASE
+)
+
+# A clock-style time range such as "between 12:00 and 20:00" or "1:02:00-1:10:30"
+TIMESTAMP = r"\d{1,2}(?::\d{2}){1,2}"
+TIME_RANGE_PATTERN = re.compile(
+    rf"(?:\b(?:between|from)\s+)?(?P<start>{TIMESTAMP})\s*(?:and|to|until|-|–)\s*(?P<end>{TIMESTAMP})",
+    re.IGNORECASE
+)
+
+SEARCH_PATTERN = re.compile(
+    r"^\s*(?:(?:please|can you|could you)\s+)?"
+    r"(?:search(?:\s+youtube)?\s+for"
+    r"|find(?:\s+me)?(?:\s+(?:a|some))?\s+videos?\s+(?:about|on|of|for)"
+    r"|look\s+up\s+videos?\s+(?:about|on|of|for)"
+    r"|show\s+me(?:\s+(?:a|some))?\s+videos?\s+(?:about|on|of|for))"
+    r"\s+(?P<query>.+?)[\s?.!]*$",
+    re.IGNORECASE
+)
+
+
+def route_query(query: str) -> Optional["types.FunctionCall"]:
+    """
+    Pick the tool for prompts whose intent is unambiguous without asking the LLM.
+
+    A prompt that is a single YouTube URL (watch, youtu.be, shorts, embed, live),
+    optionally with "summarize this" style filler, goes straight to
+    get_transcript_from_url, or to get_transcript_segment when it also names a
+    clock-style time range ("between 12:00 and 20:00"); an explicit "search for ..." / "find videos about ..."
+    goes to youtube_search. Anything else returns None and is left to Gemini's
+    function calling.
+    """
+    # Imported here so the SDK stays off the import path of the app
+    from google.genai import types
+
+    urls = URL_PATTERN.findall(query)
+    if len(urls) == 1:
+        url = urls[0] if urls[0].lower().startswith("http") else f"https://{urls[0]}"
+        remainder = URL_PATTERN.sub(" ", query).strip()
+
+        time_range = TIME_RANGE_PATTERN.search(remainder)
+        if time_range:
+            remainder = " ".join(f"{remainder[:time_range.start()]} {remainder[time_range.end():]}".split())
+            if SUMMARY_FILLER_PATTERN.match(remainder):
+                return types.FunctionCall(name="get_transcript_segment", args={
+                    "youtube_url": url,
+                    "start": time_range.group("start"),
+                    "end": time_range.group("end")
+                })
+            return None
+
+        if SUMMARY_FILLER_PATTERN.match(remainder):
+            return types.FunctionCall(name="get_transcript_from_url", args={"youtube_url": url})
+        return None
+
+    if urls:
+        return None
+
+    match = SEARCH_PATTERN.match(query)
+    if match:
+        return types.FunctionCall(name="youtube_search", args={"query": match.group("query")})
+
+    return None
@@ -0,0 +1,20 @@
+from functools import lru_cache
+from core.config import get_settings
+from services.storage.base import InvalidCursor, StorageBackend
+
+
+@lru_cache()
+def get_storage() -> StorageBackend:
+    """
+    Process wide storage backend selected by STORAGE_BACKEND ("firestore" or "sqlite").
+    """
+    settings = get_settings()
+    if settings.STORAGE_BACKEND == "sqlite":
+        from services.storage.sqlite import SQLiteStorage
+        return SQLiteStorage(path=settings.STORAGE_SQLITE_PATH)
+
+    from services.storage.firestore import FirestoreStorage
+    return FirestoreStorage(project_id=settings.PROJECT_ID)
+
+
+__all__ = ["InvalidCursor", "StorageBackend", "get_storage"]
@@ -0,0 +1,83 @@
+from typing import Dict, List, Optional, Tuple
+
+
+class InvalidCursor(ValueError):
+    """
+    Raised when a pagination position does not point at an existing record.
+    """
+
+
+class StorageBackend:
+    """
+    Storage for sessions, chat messages and collections.
+
+    Messages are dictionaries with `id`, `type` ("human" or "ai"), `content`,
+    `seq` and `created_at`. Pagination positions are small JSON serialisable
+    dictionaries that are only meaningful to the backend that produced them.
+    """
+
+    async def get_session(self, session_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    async def save_turn(
+        self,
+        session_id: str,
+        user_id: str,
+        tag: str,
+        message: str,
+        response: str,
+        title: Optional[str] = None
+    ) -> None:
+        """
+        Append a user message and its AI response to the session and upsert the
+        session record. `title` is only written when given.
+        """
+        raise NotImplementedError
+
+    async def get_messages(self, session_id: str, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Return the messages of a session oldest first, only the newest `limit` when given.
+        """
+        raise NotImplementedError
+
+    async def get_messages_page(
+        self,
+        session_id: str,
+        limit: int,
+        after: Optional[Dict] = None
+    ) -> Tuple[List[Dict], Optional[Dict]]:
+        """
+        Return up to `limit` messages oldest first after the position `after`,
+        together with the position of the next page (None on the last page).
+        """
+        raise NotImplementedError
+
+    async def list_sessions(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        after: Optional[Dict] = None
+    ) -> Tuple[List[Dict], Optional[Dict]]:
+        """
+        Return a user's sessions, most recently updated first, together with the
+        position of the next page (None on the last page).
+        """
+        raise NotImplementedError
+
+    async def create_collection(self, user_id: str, name: str, color: str) -> Dict:
+        raise NotImplementedError
+
+    async def get_collection(self, collection_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    async def list_collections(self, user_id: str) -> List[Dict]:
+        """
+        Return a user's collections, each with the ids of its member sessions under "sessions".
+        """
+        raise NotImplementedError
+
+    async def add_session_to_collection(self, collection_id: str, session_id: str) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
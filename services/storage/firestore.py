@@ -0,0 +1,144 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from google.cloud import firestore
+from services.chat_history import AsyncFirestoreChatMessageHistory
+from services.storage.base import InvalidCursor, StorageBackend
+
+
+class FirestoreStorage(StorageBackend):
+    """
+    Stores sessions and collections as documents of the "sessions" and
+    "collections" collections, and messages under `chat_history/{session_id}/messages`.
+
+    Listing sessions requires the (user_id, updated_at DESC) composite index
+    from firestore.indexes.json.
+    """
+
+    def __init__(self, project_id: Optional[str] = None, client: Optional[firestore.AsyncClient] = None,
+                 history_collection: str = "chat_history"):
+        self.project_id = project_id
+        self.history_collection = history_collection
+        self._client = client
+
+    @property
+    def client(self) -> firestore.AsyncClient:
+        if self._client is None:
+            self._client = firestore.AsyncClient(project=self.project_id)
+        return self._client
+
+    def get_chat_history(self, session_id: str) -> AsyncFirestoreChatMessageHistory:
+        return AsyncFirestoreChatMessageHistory(
+            session_id=session_id,
+            client=self.client,
+            collection=self.history_collection
+        )
+
+    async def get_session(self, session_id: str) -> Optional[Dict]:
+        doc = await self.client.collection("sessions").document(session_id).get()
+        if not doc.exists:
+            return None
+        data = doc.to_dict()
+        data["id"] = doc.id
+        return data
+
+    async def save_turn(
+        self,
+        session_id: str,
+        user_id: str,
+        tag: str,
+        message: str,
+        response: str,
+        title: Optional[str] = None
+    ) -> None:
+        # The turn and the session record are committed together in one batch
+        batch = self.client.batch()
+        self.get_chat_history(session_id).add_turn_to_batch(batch, message, response)
+
+        session_data = {
+            "user_id": user_id,
+            "tag": tag,
+            "updated_at": datetime.utcnow()
+        }
+        if title is not None:
+            session_data["title"] = title
+
+        batch.set(self.client.collection("sessions").document(session_id), session_data, merge=True)
+        await batch.commit()
+
+    async def get_messages(self, session_id: str, limit: Optional[int] = None) -> List[Dict]:
+        return await self.get_chat_history(session_id).get_messages(limit=limit)
+
+    async def get_messages_page(
+        self,
+        session_id: str,
+        limit: int,
+        after: Optional[Dict] = None
+    ) -> Tuple[List[Dict], Optional[Dict]]:
+        return await self.get_chat_history(session_id).get_page(limit, after)
+
+    async def list_sessions(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        after: Optional[Dict] = None
+    ) -> Tuple[List[Dict], Optional[Dict]]:
+        sessions_ref = self.client.collection("sessions")
+        query = sessions_ref.where("user_id", "==", user_id).order_by(
+            "updated_at", direction=firestore.Query.DESCENDING
+        )
+
+        if after is not None:
+            last_doc = await sessions_ref.document(after.get("id", "")).get()
+            if not last_doc.exists:
+                raise InvalidCursor(after)
+            query = query.start_after(last_doc)
+
+        if limit is not None:
+            # Read one extra document to know whether another page exists
+            query = query.limit(limit + 1)
+
+        sessions = []
+        async for doc in query.stream():
+            data = doc.to_dict()
+            data["id"] = doc.id
+            sessions.append(data)
+
+        next_position = None
+        if limit is not None and len(sessions) > limit:
+            sessions = sessions[:limit]
+            next_position = {"id": sessions[-1]["id"]}
+        return sessions, next_position
+
+    async def create_collection(self, user_id: str, name: str, color: str) -> Dict:
+        record_data = {
+            "name": name,
+            "color": color,
+            "user_id": user_id,
+            "created_at": datetime.utcnow()
+        }
+        # Create a new document with an auto-generated ID in the "collections" collection
+        doc_ref = self.client.collection("collections").document()
+        await doc_ref.set(record_data)
+        return {"id": doc_ref.id, **record_data}
+
+    async def get_collection(self, collection_id: str) -> Optional[Dict]:
+        doc = await self.client.collection("collections").document(collection_id).get()
+        if not doc.exists:
+            return None
+        data = doc.to_dict()
+        data["id"] = doc.id
+        return data
+
+    async def list_collections(self, user_id: str) -> List[Dict]:
+        query = self.client.collection("collections").where("user_id", "==", user_id)
+        collections = []
+        async for doc in query.stream():
+            data = doc.to_dict()
+            data["id"] = doc.id
+            collections.append(data)
+        return collections
+
+    async def add_session_to_collection(self, collection_id: str, session_id: str) -> None:
+        await self.client.collection("collections").document(collection_id).update(
+            {"sessions": firestore.ArrayUnion([session_id])}
+        )
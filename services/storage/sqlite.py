@@ -0,0 +1,306 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from services.storage.base import InvalidCursor, StorageBackend
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    tag TEXT,
+    title TEXT,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_user_updated ON sessions (user_id, updated_at DESC, id DESC);
+
+CREATE TABLE IF NOT EXISTS messages (
+    id TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_session_seq ON messages (session_id, seq);
+
+CREATE TABLE IF NOT EXISTS collections (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    name TEXT,
+    color TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS collections_user ON collections (user_id);
+
+CREATE TABLE IF NOT EXISTS collection_sessions (
+    collection_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    added_at INTEGER NOT NULL,
+    PRIMARY KEY (collection_id, session_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS collection_sessions_session ON collection_sessions (session_id, collection_id);
+"""
+
+
+def _format_time(value: datetime) -> str:
+    # Fixed width so timestamps sort correctly as text
+    return value.strftime("%Y-%m-%dT%H:%M:%S.%f")
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def _new_id() -> str:
+    return uuid.uuid4().hex[:20]
+
+
+class SQLiteStorage(StorageBackend):
+    """
+    Stores sessions, messages and collections in a local SQLite database in WAL
+    mode, for single node deployments, edge deployments and offline benchmarks.
+
+    Every read is served by an index: sessions by (user_id, updated_at),
+    messages by (session_id, seq) and collection membership by both
+    (collection_id, session_id) and (session_id, collection_id). Queries run
+    in worker threads, each with its own connection, so WAL readers do not
+    wait for each other or for the writer.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if not self._initialized:
+                conn.executescript(SCHEMA)
+                self._initialized = True
+
+            self._connections.append(conn)
+            self._local.conn = conn
+            return conn
+
+    async def _run(self, fn, *args):
+        return await asyncio.to_thread(fn, *args)
+
+    def _get_session(self, session_id: str) -> Optional[Dict]:
+        row = self._connect().execute(
+            "SELECT id, user_id, tag, title, updated_at FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        return self._session(row) if row is not None else None
+
+    @staticmethod
+    def _session(row: sqlite3.Row) -> Dict:
+        data = dict(row)
+        data["updated_at"] = _parse_time(data["updated_at"])
+        return data
+
+    @staticmethod
+    def _message(row: sqlite3.Row) -> Dict:
+        data = dict(row)
+        data["created_at"] = _parse_time(data["created_at"])
+        return data
+
+    async def get_session(self, session_id: str) -> Optional[Dict]:
+        return await self._run(self._get_session, session_id)
+
+    def _save_turn(self, session_id: str, user_id: str, tag: str, message: str, response: str,
+                   title: Optional[str]) -> None:
+        seq = time.time_ns()
+        now = _format_time(datetime.utcnow())
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT INTO messages (id, session_id, seq, type, content, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (_new_id(), session_id, seq, "human", message, now),
+                    (_new_id(), session_id, seq + 1, "ai", response, now)
+                ]
+            )
+            conn.execute(
+                """
+                INSERT INTO sessions (id, user_id, tag, title, updated_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET
+                    user_id = excluded.user_id,
+                    tag = excluded.tag,
+                    title = COALESCE(excluded.title, sessions.title),
+                    updated_at = excluded.updated_at
+                """,
+                (session_id, user_id, tag, title, now)
+            )
+
+    async def save_turn(
+        self,
+        session_id: str,
+        user_id: str,
+        tag: str,
+        message: str,
+        response: str,
+        title: Optional[str] = None
+    ) -> None:
+        await self._run(self._save_turn, session_id, user_id, tag, message, response, title)
+
+    def _get_messages(self, session_id: str, limit: Optional[int]) -> List[Dict]:
+        columns = "id, type, content, seq, created_at"
+        if limit is None:
+            rows = self._connect().execute(
+                f"SELECT {columns} FROM messages WHERE session_id = ? ORDER BY seq", (session_id,)
+            ).fetchall()
+            return [self._message(row) for row in rows]
+
+        rows = self._connect().execute(
+            f"SELECT {columns} FROM messages WHERE session_id = ? ORDER BY seq DESC LIMIT ?", (session_id, limit)
+        ).fetchall()
+        return [self._message(row) for row in reversed(rows)]
+
+    async def get_messages(self, session_id: str, limit: Optional[int] = None) -> List[Dict]:
+        return await self._run(self._get_messages, session_id, limit)
+
+    def _get_messages_page(self, session_id: str, limit: int, after: Optional[Dict]) -> Tuple[List[Dict], Optional[Dict]]:
+        seq = (after or {}).get("seq", -1)
+        # Read one extra row to know whether another page exists
+        rows = self._connect().execute(
+            """
+            SELECT id, type, content, seq, created_at FROM messages
+            WHERE session_id = ? AND seq > ? ORDER BY seq LIMIT ?
+            """,
+            (session_id, seq, limit + 1)
+        ).fetchall()
+        messages = [self._message(row) for row in rows]
+        next_after = {"seq": messages[limit - 1]["seq"]} if len(messages) > limit else None
+        return messages[:limit], next_after
+
+    async def get_messages_page(
+        self,
+        session_id: str,
+        limit: int,
+        after: Optional[Dict] = None
+    ) -> Tuple[List[Dict], Optional[Dict]]:
+        return await self._run(self._get_messages_page, session_id, limit, after)
+
+    def _list_sessions(self, user_id: str, limit: Optional[int], after: Optional[Dict]) -> Tuple[List[Dict], Optional[Dict]]:
+        conn = self._connect()
+        sql = "SELECT id, user_id, tag, title, updated_at FROM sessions WHERE user_id = ?"
+        params: list = [user_id]
+
+        if after is not None:
+            last = conn.execute(
+                "SELECT id, updated_at FROM sessions WHERE id = ?", (after.get("id", ""),)
+            ).fetchone()
+            if last is None:
+                raise InvalidCursor(after)
+            sql += " AND (updated_at < ? OR (updated_at = ? AND id < ?))"
+            params += [last["updated_at"], last["updated_at"], last["id"]]
+
+        sql += " ORDER BY updated_at DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit + 1)
+
+        sessions = [self._session(row) for row in conn.execute(sql, params).fetchall()]
+
+        next_position = None
+        if limit is not None and len(sessions) > limit:
+            sessions = sessions[:limit]
+            next_position = {"id": sessions[-1]["id"]}
+        return sessions, next_position
+
+    async def list_sessions(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        after: Optional[Dict] = None
+    ) -> Tuple[List[Dict], Optional[Dict]]:
+        return await self._run(self._list_sessions, user_id, limit, after)
+
+    def _create_collection(self, user_id: str, name: str, color: str) -> Dict:
+        record = {
+            "id": _new_id(),
+            "name": name,
+            "color": color,
+            "user_id": user_id,
+            "created_at": datetime.utcnow()
+        }
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT INTO collections (id, user_id, name, color, created_at) VALUES (?, ?, ?, ?, ?)",
+                (record["id"], user_id, name, color, _format_time(record["created_at"]))
+            )
+        return record
+
+    async def create_collection(self, user_id: str, name: str, color: str) -> Dict:
+        return await self._run(self._create_collection, user_id, name, color)
+
+    def _load_collections(self, where: str, params: tuple) -> List[Dict]:
+        rows = self._connect().execute(
+            f"""
+            SELECT c.id, c.user_id, c.name, c.color, c.created_at, m.session_id
+            FROM collections c LEFT JOIN collection_sessions m ON m.collection_id = c.id
+            WHERE {where} ORDER BY c.created_at, m.added_at
+            """,
+            params
+        ).fetchall()
+
+        collections: Dict[str, Dict] = {}
+        for row in rows:
+            collection = collections.get(row["id"])
+            if collection is None:
+                collection = collections[row["id"]] = {
+                    "id": row["id"],
+                    "user_id": row["user_id"],
+                    "name": row["name"],
+                    "color": row["color"],
+                    "created_at": _parse_time(row["created_at"]),
+                    "sessions": []
+                }
+            if row["session_id"] is not None:
+                collection["sessions"].append(row["session_id"])
+        return list(collections.values())
+
+    async def get_collection(self, collection_id: str) -> Optional[Dict]:
+        collections = await self._run(self._load_collections, "c.id = ?", (collection_id,))
+        return collections[0] if collections else None
+
+    async def list_collections(self, user_id: str) -> List[Dict]:
+        return await self._run(self._load_collections, "c.user_id = ?", (user_id,))
+
+    def _add_session_to_collection(self, collection_id: str, session_id: str) -> None:
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO collection_sessions (collection_id, session_id, added_at) VALUES (?, ?, ?)",
+                (collection_id, session_id, time.time_ns())
+            )
+
+    async def add_session_to_collection(self, collection_id: str, session_id: str) -> None:
+        await self._run(self._add_session_to_collection, collection_id, session_id)
+
+    async def close(self) -> None:
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+            self._local = threading.local()
@@ -0,0 +1,84 @@
+import asyncio
+import re
+from typing import TYPE_CHECKING, Dict, List
+from core.config import get_settings
+from core.metrics import timed
+from utils.constants import CHUNK_SUMMARY_PROMPT, TRANSCRIPT_PROMPT
+from utils.tokens import CHARS_PER_TOKEN, estimate_tokens
+
+if TYPE_CHECKING:
+    from google import genai
+
+
+def split_transcript(text: str, max_tokens: int) -> List[str]:
+    """
+    Split a transcript into chunks of at most `max_tokens` estimated tokens,
+    breaking on sentence boundaries where possible and on words otherwise.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    chunks = []
+    current = ""
+
+    for sentence in re.split(r"(?<=[.!?])\s+", text):
+        # Transcripts often lack punctuation, so fall back to word boundaries
+        pieces = [sentence] if len(sentence) <= max_chars else sentence.split(" ")
+        for piece in pieces:
+            if current and len(current) + len(piece) + 1 > max_chars:
+                chunks.append(current)
+                current = ""
+            current = f"{current} {piece}" if current else piece
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class Summarizer:
+    """
+    Builds the prompt for the final summary call.
+
+    Short transcripts go to the model in one piece. Long ones are split into
+    token-bounded chunks that are summarised concurrently (map), and the final
+    call merges those partial summaries (reduce).
+    """
+
+    def __init__(self, client: "genai.Client", model: str):
+        settings = get_settings()
+        self.client = client
+        self.model = model
+        self.chunk_tokens = settings.SUMMARY_CHUNK_TOKENS
+        self.single_call_tokens = settings.SUMMARY_SINGLE_CALL_TOKENS
+        self.concurrency = settings.SUMMARY_MAP_CONCURRENCY
+
+    async def _summarize_chunks(self, video_info: Dict, chunks: List[str]) -> List[str]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def summarize_chunk(index: int, chunk: str) -> str:
+            async with semaphore, timed("gemini.summarize_chunk"):
+                response = await self.client.aio.models.generate_content(
+                    model=self.model,
+                    contents=(
+                        f"{CHUNK_SUMMARY_PROMPT.format(part=index + 1, total=len(chunks))}\n\n"
+                        f" title: {video_info.get('title', '')}\n\n transcript: {chunk}"
+                    )
+                )
+                return response.text or ""
+
+        return await asyncio.gather(*(summarize_chunk(i, chunk) for i, chunk in enumerate(chunks)))
+
+    async def build_contents(self, video_info: Dict, conversation_context: str, prompt: str = TRANSCRIPT_PROMPT) -> str:
+        """
+        Return the contents of the final summary call for a get_transcript_from_url
+        (or get_transcript_segment) result.
+        """
+        transcript = video_info.get("transcript", "") if isinstance(video_info, dict) else ""
+
+        if estimate_tokens(transcript) > self.single_call_tokens:
+            chunks = split_transcript(transcript, self.chunk_tokens)
+            partial_summaries = await self._summarize_chunks(video_info, chunks)
+            video_info = {
+                **{key: value for key, value in video_info.items() if key != "transcript"},
+                "transcript_section_summaries": partial_summaries
+            }
+
+        return f"{prompt}\n\n Past Conversations: {conversation_context}\n\n video_info: {video_info}"
@@ -1,76 +1,259 @@
-import requests
+import asyncio
+import math
 import os
 import re
-from pytubefix import YouTube
-from googleapiclient.discovery import build
+from typing import Optional, Tuple
 from dotenv import load_dotenv
-from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
+from starlette.status import HTTP_400_BAD_REQUEST
+from core.config import get_settings
+from core.http import get_http_client
+from core.metrics import timed
+from services.cache_service import get_search_cache, get_transcript_cache, normalize_query
+from utils.singleflight import SingleFlight
+from utils.transcript_codec import CompressedTranscript
 
 
 load_dotenv()
 
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 
-def youtube_search(query: str) -> list[dict]:
+transcript_flights = SingleFlight()
+search_flights = SingleFlight()
+
+# "12:00", "1:02:03", "754.5"
+CLOCK_PATTERN = re.compile(r"^(?:(\d+):)?(\d+):(\d{1,2}(?:\.\d+)?)$")
+# "12m", "1h 2m 3s", "90 seconds"
+UNITS_PATTERN = re.compile(
+    r"^(?:(\d+(?:\.\d+)?)\s*h(?:ours?|rs?)?)?\s*"
+    r"(?:(\d+(?:\.\d+)?)\s*m(?:in(?:ute)?s?)?)?\s*"
+    r"(?:(\d+(?:\.\d+)?)\s*s(?:ec(?:ond)?s?)?)?$"
+)
+
+
+async def youtube_search(query: str) -> list[dict]:
     """
     Search youtube for videos based on a query and returns a list of dictionaries 
     with 10 video information so the user can select which to transcribe
+
+    Results are cached by normalised query to save search.list quota.
     """
+    key = normalize_query(query)
+
+    cache = get_search_cache()
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    async def search_and_cache() -> list[dict]:
+        results = await search_youtube(query)
+        if results:
+            cache.set(key, results)
+        return results
+
+    return await search_flights.do(key, search_and_cache)
+
 
+@timed("upstream.youtube_search")
+async def search_youtube(query: str) -> list[dict]:
+    """
+    Call search.list and a batched videos.list for a query, bypassing the cache.
+    """
     try:
-        youtube = build('youtube', 'v3', developerKey=YOUTUBE_API_KEY)
+        http = get_http_client()
+        youtube_api_url = get_settings().YOUTUBE_API_URL
 
-        request = youtube.search().list(
-            part="snippet",
-            maxResults=10,
-            q=query,
-            type="video"
-        )
-        response = request.execute()
+        response = await http.get(f"{youtube_api_url}/search", params={
+            "part": "snippet",
+            "maxResults": 10,
+            "q": query,
+            "type": "video",
+            "key": YOUTUBE_API_KEY
+        })
+        response.raise_for_status()
+        response = response.json()
 
         if not response['items']:
             return None
 
+        video_ids = [video['id']['videoId'] for video in response['items']]
+
+        # Fetch snippet and statistics for every result in a single videos.list call
+        video_response = await http.get(f"{youtube_api_url}/videos", params={
+            "part": "snippet,statistics",
+            "id": ",".join(video_ids),
+            "key": YOUTUBE_API_KEY
+        })
+        video_response.raise_for_status()
+        video_response = video_response.json()
+
+        details_by_id = {item['id']: item for item in video_response['items']}
+
         results = []
 
-        for video in response['items']:
-            video_id = video['id']['videoId']
-            
-            video_request = youtube.videos().list(
-                part="snippet,statistics",
-                id=video_id
-            )
-            video_response = video_request.execute()
-            
-            if video_response['items']:
-                video_details = video_response['items'][0]
-                
-                results.append({
-                    'video_id': video_id,
-                    'title': video_details['snippet']['title'],
-                    'description': video_details['snippet']['description'],
-                    'channel': video_details['snippet']['channelTitle'],
-                    'views': video_details['statistics'].get('viewCount', '0'),
-                    'url': f'https://www.youtube.com/watch?v={video_id}',
-                    'thumbnail': video_details['snippet']['thumbnails']['high']['url']
-                })
+        # Keep the ordering returned by search.list
+        for video_id in video_ids:
+            video_details = details_by_id.get(video_id)
+            if video_details is None:
+                continue
+
+            results.append({
+                'video_id': video_id,
+                'title': video_details['snippet']['title'],
+                'description': video_details['snippet']['description'],
+                'channel': video_details['snippet']['channelTitle'],
+                'views': video_details['statistics'].get('viewCount', '0'),
+                'url': f'https://www.youtube.com/watch?v={video_id}',
+                'thumbnail': video_details['snippet']['thumbnails']['high']['url']
+            })
         
         return results
     except Exception as e:
         raise Exception(f"Error searching YouTube video: {str(e)}")
 
 
-def get_transcript_from_url(youtube_url: str) -> dict:
+def extract_video_id(youtube_url: str) -> str | None:
+    """
+    Return the video id of a YouTube URL, or None if the URL is not recognised.
+    """
+    match = re.search(r"(?:v=|youtu\.be/|/shorts/|/embed/|/live/)([\w-]+)", youtube_url)
+    return match.group(1) if match else None
+
+
+def parse_timestamp(value) -> float:
+    """
+    Parse a video position ("12:00", "1:02:03", "12m30s" or plain seconds) into seconds.
+    """
+    if isinstance(value, (int, float)):
+        seconds = float(value)
+    else:
+        text = str(value or "").strip().lower()
+        clock = CLOCK_PATTERN.match(text)
+        units = UNITS_PATTERN.match(text)
+        try:
+            seconds = float(text)
+        except ValueError:
+            if clock:
+                hours, minutes, secs = clock.groups()
+                seconds = int(hours or 0) * 3600 + int(minutes) * 60 + float(secs)
+            elif text and units and any(units.groups()):
+                hours, minutes, secs = (float(group or 0) for group in units.groups())
+                seconds = hours * 3600 + minutes * 60 + secs
+            else:
+                raise ValueError(f"Invalid timestamp: {value!r}")
+
+    if seconds < 0 or not math.isfinite(seconds):
+        raise ValueError(f"Invalid timestamp: {value!r}")
+    return seconds
+
+
+def parse_time_range(start, end) -> Tuple[float, float]:
+    start_seconds, end_seconds = parse_timestamp(start), parse_timestamp(end)
+    if end_seconds <= start_seconds:
+        raise ValueError("The end of the time range must be after its start")
+    return start_seconds, end_seconds
+
+
+def format_timestamp(seconds: float) -> str:
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
+
+
+async def get_transcript_from_url(youtube_url: str) -> dict:
     """
     Fetch transcript for a YouTube video using the video URL and return its transcript along with metadata.
     """
-    match = re.search(r"(?:v=|youtu\.be/)([\w-]+)", youtube_url)
-    if not match:
+    record = await get_transcript_record(youtube_url)
+    if not record:
         return {}
-    
-    video_id = match.group(1)
+    return {**record, "transcript": CompressedTranscript.from_dict(record["transcript"]).text()}
+
+
+async def get_transcript_segment(youtube_url: str, start: str, end: str) -> dict:
+    """
+    Fetch the part of a YouTube video's transcript between `start` and `end`
+    along with the video metadata.
+
+    Only the compressed blocks covering the range are decompressed, and only
+    that slice is returned, so the model never sees the rest of the video.
+    """
+    try:
+        start_seconds, end_seconds = parse_time_range(start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=str(e))
+
+    record = await get_transcript_record(youtube_url)
+    if not record:
+        return {}
+
+    transcript = CompressedTranscript.from_dict(record["transcript"])
+    text = transcript.slice(start_seconds, end_seconds)
+    if not text:
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST,
+            detail=f"The video has no transcript between {format_timestamp(start_seconds)} and {format_timestamp(end_seconds)}"
+        )
+
+    return {
+        **record,
+        "start": format_timestamp(start_seconds),
+        "end": format_timestamp(min(end_seconds, transcript.duration)),
+        "transcript": text
+    }
+
+
+async def get_cached_transcript_record(youtube_url: str) -> Optional[dict]:
+    """
+    Return a video's transcript record if it is already cached, without fetching it.
+    """
+    video_id = extract_video_id(youtube_url)
+    if not video_id:
+        return None
+
+    cached = await get_transcript_cache().get(video_id)
+    # Entries written before compression hold the flat text and are refetched
+    if cached is not None and isinstance(cached.get("transcript"), dict):
+        return cached
+    return None
+
+
+async def get_transcript_record(youtube_url: str) -> dict:
+    """
+    Return the stored form of a video's transcript: its metadata, with the
+    transcript as a CompressedTranscript dict (see utils/transcript_codec.py).
+
+    Results are cached by video_id, first in process and then in the persistent tier,
+    and concurrent misses for the same video are coalesced into a single fetch.
+    """
+    video_id = extract_video_id(youtube_url)
+    if not video_id:
+        return {}
+
+    cached = await get_cached_transcript_record(youtube_url)
+    if cached is not None:
+        return cached
+
+    cache = get_transcript_cache()
+
+    async def fetch_and_cache() -> dict:
+        result = await fetch_transcript(video_id)
+        if result["transcript"]["size"]:
+            await cache.set(video_id, result)
+        return result
+
+    # Concurrent requests for the same video share one upstream fetch
+    return await transcript_flights.do(video_id, fetch_and_cache)
+
+
+@timed("upstream.transcript")
+async def fetch_transcript(video_id: str) -> dict:
+    """
+    Call youtube-transcript.io and the YouTube Data API for a video, bypassing the cache.
+
+    Segment timing is kept: the transcript is returned compressed, with its time index.
+    """
     transcript_api_key = os.getenv("YOUTUBE_TRANSCRIPT_IO_API_TOKEN")
-    youtube_api_key = os.getenv("YOUTUBE_API_KEY")
     
     headers = {
         "Authorization": f"Basic {transcript_api_key}",
@@ -78,20 +261,19 @@ def get_transcript_from_url(youtube_url: str) -> dict:
     }
     payload = {"ids": [video_id]}
     
-    transcript_url = "https://www.youtube-transcript.io/api/transcripts"
-    details_url = (
-        f"https://www.googleapis.com/youtube/v3/videos?"
-        f"id={video_id}&key={youtube_api_key}&part=snippet,contentDetails,statistics"
+    http = get_http_client()
+    settings = get_settings()
+
+    # Run both API calls concurrently over the shared connection pool
+    transcript_response, details_response = await asyncio.gather(
+        http.post(settings.TRANSCRIPT_API_URL, headers=headers, json=payload),
+        http.get(f"{settings.YOUTUBE_API_URL}/videos", params={
+            "id": video_id,
+            "key": YOUTUBE_API_KEY,
+            "part": "snippet,contentDetails,statistics"
+        })
     )
     
-    # Run both API calls concurrently using ThreadPoolExecutor
-    with ThreadPoolExecutor(max_workers=2) as executor:
-        future_transcript = executor.submit(requests.post, transcript_url, headers=headers, json=payload)
-        future_details = executor.submit(requests.get, details_url)
-        
-        transcript_response = future_transcript.result()
-        details_response = future_details.result()
-    
     # Process video details
     data = details_response.json()
     if data['items']:
@@ -113,10 +295,10 @@ def get_transcript_from_url(youtube_url: str) -> dict:
     transcript_data = transcript_response.json()
     # Assumes transcript_data is a list with at least one item containing a 'tracks' key.
     transcript_segments = transcript_data[0]["tracks"][0]['transcript']
-    transcript_text = " ".join(segment["text"] for segment in transcript_segments)
+    transcript = CompressedTranscript.from_segments(transcript_segments)
     
     return {
-        "transcript": transcript_text,
+        "transcript": transcript.to_dict(),
         "title": title,
         "description": description,
         "published_at": published_at,
@@ -1,16 +1,36 @@
-from google import genai
-import os
-from dotenv import load_dotenv
-from utils.constants import TRANSCRIPT_PROMPT, SYSTEM_PROMPT,  FUNCTION_CALL_CONFIG
+import asyncio
+import inspect
+from typing import TYPE_CHECKING, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from core.config import get_settings
+from core.container import get_container
+from core.metrics import timed
+from utils.constants import TRANSCRIPT_PROMPT, SYSTEM_PROMPT,  FUNCTION_CALL_CONFIG, PROMPT_VERSION, CHUNK_SUMMARY_PROMPT, SEGMENT_PROMPT
+from services.cache_service import get_summary_cache, summary_cache_key
+from services.context_builder import ContextBuilder
 from services.firestore_service import FirestoreService
-from services.tools import get_transcript_from_url, youtube_search
+from services.router import route_query
+from services.summarizer import Summarizer
+from services.tools import (
+    extract_video_id, get_transcript_from_url, get_transcript_record, get_transcript_segment, parse_time_range, youtube_search
+)
+from utils.singleflight import SingleFlight
 
+if TYPE_CHECKING:
+    from google.genai import types
 
-load_dotenv()
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_MODEL = "gemini-1.5-pro"
 
-client = genai.Client(api_key=GEMINI_API_KEY)
+summary_flights = SingleFlight()
+
+available_functions = {
+    "youtube_search": youtube_search,
+    "get_transcript_from_url": get_transcript_from_url,
+    "get_transcript_segment": get_transcript_segment,
+}
+
+# Tools whose result is a transcript to summarise rather than an answer in itself
+SUMMARY_FUNCTIONS = ("get_transcript_from_url", "get_transcript_segment")
 
 
 class YoutubeService:
@@ -19,53 +39,287 @@ class YoutubeService:
         self.user_id = user_id
         self.tag = tag
         self.firestore = FirestoreService(session_id=self.session_id, tag=self.tag)
+        self.client = get_container().gemini
+        self.summarizer = Summarizer(client=self.client, model=GEMINI_MODEL)
+        self.context_builder = ContextBuilder()
 
 
-    async def get_youtube_summary (self, query: str):
+    async def _get_conversations(self) -> List[Dict]:
+        return await self.firestore.get_user_conversations(limit=10)
 
-        await self.firestore.store_conversation(self.user_id, query)
-        recent_conversations = await self.firestore.get_user_conversations(limit=10)
-   
-        conversation_context = []
-        for conv in recent_conversations:
-            conversation_context.extend([
-                {"role": "user", "content": conv['message']},
-                {"role": "assistant", "content": conv['response']}
-            ])
+    @property
+    def retrieval(self):
+        # Imported on first use so NumPy stays off the import path of the app
+        from services.retrieval_service import get_retrieval_service
+        return get_retrieval_service() if get_settings().RETRIEVAL_ENABLED else None
 
-        first_response = client.models.generate_content(
-            model="gemini-1.5-pro",
-            config=FUNCTION_CALL_CONFIG,
-            contents=f"{SYSTEM_PROMPT}\n\n Past Conversations: {conversation_context}\n\n User Query: {query}" 
-        )
+    def _index_transcript(self, function) -> None:
+        """
+        Add the video of a transcript call to this session's retrieval index in the
+        background. Called once the transcript was fetched or a summary was served;
+        an uncached transcript is never fetched just for the index.
+        """
+        retrieval = self.retrieval
+        if retrieval is not None and function.name in SUMMARY_FUNCTIONS:
+            retrieval.schedule_index(self.session_id, function.args.get("youtube_url", ""))
+
+    async def _retrieve_excerpts(self, query: str) -> str:
+        """
+        Transcript excerpts from this session's earlier videos that are relevant to the query.
+        Retrieval is best effort: any failure just means no excerpts.
+        """
+        retrieval = self.retrieval
+        if retrieval is None:
+            return ""
+        try:
+            return retrieval.format_excerpts(await retrieval.search(self.session_id, query))
+        except Exception:
+            return ""
+
+    async def _plan(self, query: str, conversations: List[Dict]) -> Tuple[Optional["types.FunctionCall"], Optional[str]]:
+        """
+        Decide how to answer the query, returning the tool call to make (if any) and
+        the model's text. Unambiguous prompts are routed locally without an LLM call.
+        """
+        routed = route_query(query)
+        if routed is not None:
+            return routed, None
+
+        conversation_context = self.context_builder.build(conversations)
+        excerpts = await self._retrieve_excerpts(query)
+        if excerpts:
+            conversation_context = f"{conversation_context}\n\n Relevant transcript excerpts:\n{excerpts}"
+
+        async with timed("gemini.plan"):
+            first_response = await self.client.aio.models.generate_content(
+                model=GEMINI_MODEL,
+                config=FUNCTION_CALL_CONFIG,
+                contents=f"{SYSTEM_PROMPT}\n\n Past Conversations: {conversation_context}\n\n User Query: {query}" 
+            )
 
         part = first_response.candidates[0].content.parts[0]
+        return part.function_call, part.text
 
-        function = part.function_call
+    def _summary_context(self, conversations: List[Dict], summary_key: Optional[str]) -> str:
+        # A cached summary is served to every user, so it must not depend on this user's history
+        if summary_key:
+            return ""
+        # The summary call only needs a little context; the video is the subject
+        return self.context_builder.build(conversations, max_tokens=get_settings().SUMMARY_CONTEXT_MAX_TOKENS)
 
+    def _summary_prompt(self, function) -> str:
+        return SEGMENT_PROMPT if function.name == "get_transcript_segment" else TRANSCRIPT_PROMPT
 
-        if function is not None:
-            available_functions = {
-                "youtube_search": youtube_search,
-                "get_transcript_from_url": get_transcript_from_url,
-            }
+    async def _get_cached_summary(self, function) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Return the summary cache key for a transcript call and the cached summary, if any.
+        """
+        if function.name not in SUMMARY_FUNCTIONS:
+            return None, None
+
+        video_id = extract_video_id(function.args.get("youtube_url", ""))
+        if not video_id:
+            return None, None
+
+        prompt = f"{TRANSCRIPT_PROMPT}{CHUNK_SUMMARY_PROMPT}"
+        if function.name == "get_transcript_segment":
+            try:
+                start, end = parse_time_range(function.args.get("start"), function.args.get("end"))
+            except ValueError:
+                return None, None
+            # Each time range of a video is summarised and cached on its own
+            prompt = f"{SEGMENT_PROMPT}{CHUNK_SUMMARY_PROMPT}{start:g}-{end:g}"
+
+        summary_key = summary_cache_key(video_id, prompt, GEMINI_MODEL, PROMPT_VERSION)
+        cached = await get_summary_cache().get(summary_key)
+        return summary_key, cached["summary"] if cached is not None else None
 
-            function_to_call = available_functions.get(function.name, None)
+    async def _call_function(self, function):
+        function_to_call = available_functions.get(function.name, None)
+        async with timed(f"tool.{function.name}"):
             function_response = function_to_call(**function.args)
+            if inspect.isawaitable(function_response):
+                function_response = await function_response
+        return function_response
 
-            if function.name == "get_transcript_from_url":
-                second_response = client.models.generate_content(
-                    model="gemini-1.5-pro",
+    async def _generate_summary(self, function, conversations: List[Dict], summary_key: Optional[str]) -> str:
+        """
+        Fetch the transcript and summarise it, caching the result under `summary_key`.
+        Concurrent requests for the same key share a single generation.
+        """
+        async def generate() -> str:
+            function_response = await self._call_function(function)
+            contents = await self.summarizer.build_contents(
+                function_response, self._summary_context(conversations, summary_key), self._summary_prompt(function)
+            )
+            async with timed("gemini.summarize"):
+                response = await self.client.aio.models.generate_content(
+                    model=GEMINI_MODEL,
                     config=FUNCTION_CALL_CONFIG,
-                    contents=f"{TRANSCRIPT_PROMPT}\n\n Past Conversations: {conversation_context}\n\n video_info: {function_response}" 
+                    contents=contents
                 )
 
-                await self.firestore.store_conversation(self.user_id, query, second_response.text)
+            if summary_key and response.text:
+                await get_summary_cache().set(summary_key, {"summary": response.text})
+            return response.text
+
+        if summary_key is None:
+            return await generate()
+        return await summary_flights.do(summary_key, generate)
+
+
+    async def get_youtube_summary (self, query: str, progress: Optional[Callable[[str], Awaitable[None]]] = None):
+        """
+        Answer a query, searching YouTube or summarising a video when needed.
+        The turn is stored once, together with its response, when it completes.
+
+        `progress`, if given, is awaited with the name of each pipeline stage as it starts.
+        """
+        async def report(stage: str) -> None:
+            if progress is not None:
+                await progress(stage)
+
+        await report("planning")
+        conversations = await self._get_conversations()
+
+        function, text = await self._plan(query, conversations)
+
+
+        if function is not None:
+            summary_key, cached_summary = await self._get_cached_summary(function)
+            if cached_summary is not None:
+                self._index_transcript(function)
+                await self.firestore.store_conversation(self.user_id, query, cached_summary)
+                return cached_summary
+
+            if function.name in SUMMARY_FUNCTIONS:
+                await report("summarizing")
+                summary = await self._generate_summary(function, conversations, summary_key)
+                self._index_transcript(function)
+
+                await self.firestore.store_conversation(self.user_id, query, summary)
 
-                return second_response.text
+                return summary
             else:
+                await report("searching")
+                function_response = await self._call_function(function)
+                await self.firestore.store_conversation(self.user_id, query)
                 return function_response
                 
         else:
+            await self.firestore.store_conversation(self.user_id, query)
+            return text
+
+    async def stream_youtube_summary(self, query: str) -> AsyncIterator[Tuple[str, object]]:
+        """
+        Streaming variant of get_youtube_summary.
+
+        Yields ("token", text) pairs while the summary is generated and a final
+        ("done", result) pair; the full summary is persisted once the stream ends.
+        """
+        conversations = await self._get_conversations()
+
+        function, text = await self._plan(query, conversations)
+
+        if function is None:
+            await self.firestore.store_conversation(self.user_id, query)
+            yield "token", text
+            yield "done", text
+            return
+
+        summary_key, cached_summary = await self._get_cached_summary(function)
+        if cached_summary is not None:
+            self._index_transcript(function)
+            await self.firestore.store_conversation(self.user_id, query, cached_summary)
+            yield "token", cached_summary
+            yield "done", cached_summary
+            return
+
+        if function.name not in SUMMARY_FUNCTIONS:
+            function_response = await self._call_function(function)
+            await self.firestore.store_conversation(self.user_id, query)
+            yield "done", function_response
+            return
+
+        # Another request is already generating this summary; wait for it instead
+        inflight = summary_flights.inflight(summary_key) if summary_key else None
+        if inflight is not None:
+            summary = await asyncio.shield(inflight)
+            self._index_transcript(function)
+            await self.firestore.store_conversation(self.user_id, query, summary)
+            yield "token", summary
+            yield "done", summary
+            return
+
+        function_response = await self._call_function(function)
+        self._index_transcript(function)
+
+        chunks = []
+        contents = await self.summarizer.build_contents(
+            function_response, self._summary_context(conversations, summary_key), self._summary_prompt(function)
+        )
+        with timed("gemini.summarize_stream"):
+            stream = await self.client.aio.models.generate_content_stream(
+                model=GEMINI_MODEL,
+                config=FUNCTION_CALL_CONFIG,
+                contents=contents
+            )
+            async for chunk in stream:
+                if chunk.text:
+                    chunks.append(chunk.text)
+                    yield "token", chunk.text
+
+        summary = "".join(chunks)
+        if summary_key and summary:
+            await get_summary_cache().set(summary_key, {"summary": summary})
+
+        await self.firestore.store_conversation(self.user_id, query, summary)
+
+        yield "done", summary
+
+    async def summarize_videos(self, items: List[str], collection_id: Optional[str] = None) -> AsyncIterator[Dict]:
+        """
+        Summarise several videos (URLs or bare video ids) into this session.
+
+        Transcripts are fetched concurrently, at most BATCH_MAX_CONCURRENCY
+        summaries are generated at once, and a result dict is yielded for each
+        item as soon as it finishes. When `collection_id` is given the session is
+        added to that collection once every item is done.
+        """
+        from google.genai.types import FunctionCall
+
+        conversations = await self._get_conversations()
+        semaphore = asyncio.Semaphore(get_settings().BATCH_MAX_CONCURRENCY)
+
+        async def summarize(index: int, item: str) -> Dict:
+            video_id = extract_video_id(item) or item.strip()
+            url = f"https://www.youtube.com/watch?v={video_id}"
+            result = {"index": index, "item": item, "video_id": video_id}
+
+            try:
+                function = FunctionCall(name="get_transcript_from_url", args={"youtube_url": url})
+                summary_key, summary = await self._get_cached_summary(function)
+
+                if summary is None:
+                    # Warm the transcript cache outside the limiter so fetches overlap
+                    await get_transcript_record(url)
+                    async with semaphore:
+                        summary = await self._generate_summary(function, conversations, summary_key)
+                self._index_transcript(function)
+
+                await self.firestore.store_conversation(self.user_id, url, summary)
+                result["summary"] = summary
+            except Exception as e:
+                result["error"] = str(e)
+            return result
+
+        tasks = [asyncio.create_task(summarize(index, item)) for index, item in enumerate(items)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
 
-            return part.text
\ No newline at end of file
+        if collection_id:
+            await self.firestore.add_session_to_collection(collection_id, self.session_id, self.user_id)
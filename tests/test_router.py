@@ -0,0 +1,54 @@
+import pytest
+from services.router import route_query
+
+
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+@pytest.mark.parametrize("query", [
+    URL,
+    f"summarize {URL}",
+    f"Can you summarise this video: {URL}",
+    f"tl;dr {URL}",
+    "youtu.be/dQw4w9WgXcQ",
+    "please explain https://www.youtube.com/shorts/dQw4w9WgXcQ",
+])
+def test_url_with_filler_routes_to_transcript(query):
+    call = route_query(query)
+    assert call.name == "get_transcript_from_url"
+    assert "dQw4w9WgXcQ" in call.args["youtube_url"]
+    assert call.args["youtube_url"].startswith("https://")
+
+
+@pytest.mark.parametrize("query", [
+    f"summarize {URL} between 12:00 and 20:00",
+    f"what happens in this part? {URL} from 12:00 to 20:00",
+    f"{URL} 12:00-20:00",
+])
+def test_url_with_time_range_routes_to_segment(query):
+    call = route_query(query)
+    assert call.name == "get_transcript_segment"
+    assert call.args == {"youtube_url": URL, "start": "12:00", "end": "20:00"}
+
+
+@pytest.mark.parametrize("query", [
+    f"what does he say about pricing in {URL}?",
+    f"compare {URL} and https://youtu.be/abcdefghijk",
+    f"{URL} {URL}",
+    f"what does he say about pricing between 12:00 and 20:00 in {URL}",
+    "what is the capital of France?",
+    "summarize the video we talked about",
+])
+def test_ambiguous_prompts_are_left_to_the_model(query):
+    assert route_query(query) is None
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("search for python tutorials", "python tutorials"),
+    ("Find me some videos about sourdough baking?", "sourdough baking"),
+    ("can you show me videos on rust async", "rust async"),
+])
+def test_explicit_search_routes_to_youtube_search(query, expected):
+    call = route_query(query)
+    assert call.name == "youtube_search"
+    assert call.args == {"query": expected}
@@ -0,0 +1,66 @@
+import asyncio
+import pytest
+from services.storage.base import InvalidCursor
+from services.storage.sqlite import SQLiteStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SQLiteStorage(str(tmp_path / "easywatch.db"))
+    yield storage
+    asyncio.run(storage.close())
+
+
+def read_all_pages(page, limit):
+    items, after = [], None
+    while True:
+        batch, after = asyncio.run(page(limit, after))
+        assert len(batch) <= limit
+        items += batch
+        if after is None:
+            return items
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 10, 11])
+def test_message_pages_cover_the_session_in_order(storage, limit):
+    for turn in range(5):
+        asyncio.run(storage.save_turn("s1", "u1", "tag", f"q{turn}", f"a{turn}"))
+    asyncio.run(storage.save_turn("s2", "u1", "tag", "other", "other"))
+
+    messages = read_all_pages(lambda limit, after: storage.get_messages_page("s1", limit, after), limit)
+
+    assert [m["content"] for m in messages] == [text for turn in range(5) for text in (f"q{turn}", f"a{turn}")]
+    assert [m["type"] for m in messages[:2]] == ["human", "ai"]
+
+
+def test_latest_messages_are_returned_oldest_first(storage):
+    for turn in range(3):
+        asyncio.run(storage.save_turn("s1", "u1", "tag", f"q{turn}", f"a{turn}"))
+
+    assert [m["content"] for m in asyncio.run(storage.get_messages("s1", limit=3))] == ["a1", "q2", "a2"]
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 6])
+def test_session_pages_break_updated_at_ties_by_id(storage, limit):
+    conn = storage._connect()
+    with conn:
+        conn.executemany(
+            "INSERT INTO sessions (id, user_id, tag, title, updated_at) VALUES (?, ?, ?, ?, ?)",
+            [
+                ("a", "u1", "tag", None, "2024-01-01T00:00:00.000000"),
+                ("b", "u1", "tag", None, "2024-01-02T00:00:00.000000"),
+                ("c", "u1", "tag", None, "2024-01-02T00:00:00.000000"),
+                ("d", "u1", "tag", None, "2024-01-02T00:00:00.000000"),
+                ("e", "u1", "tag", None, "2024-01-03T00:00:00.000000"),
+                ("f", "u2", "tag", None, "2024-01-02T00:00:00.000000"),
+            ]
+        )
+
+    sessions = read_all_pages(lambda limit, after: storage.list_sessions("u1", limit, after), limit)
+
+    assert [s["id"] for s in sessions] == ["e", "d", "c", "b", "a"]
+
+
+def test_unknown_session_cursor_is_rejected(storage):
+    with pytest.raises(InvalidCursor):
+        asyncio.run(storage.list_sessions("u1", 10, {"id": "missing"}))
@@ -0,0 +1,85 @@
+import random
+import pytest
+from utils.transcript_codec import CompressedTranscript
+
+
+def make_segments(count, seed=0):
+    rng = random.Random(seed)
+    segments, start = [], 0.0
+    for i in range(count):
+        duration = rng.uniform(0.5, 6.0)
+        words = " ".join(f"w{i}x{j}" for j in range(rng.randint(1, 12)))
+        segments.append({"text": f"{words} ", "start": round(start, 3), "dur": round(duration, 3)})
+        start += duration
+    return segments
+
+
+def expected_segments(segments, start, end):
+    """
+    Reference implementation: every segment in progress at `start` or
+    starting before `end`.
+    """
+    starts = [int(s["start"] * 1000) for s in segments]
+    duration_ms = max(int(s["start"] * 1000) + int(s["dur"] * 1000) for s in segments)
+    if start * 1000 >= duration_ms:
+        return []
+    start_ms, end_ms = int(start * 1000), int(end * 1000)
+    return [
+        {"start": starts[i] / 1000, "text": s["text"].strip()}
+        for i, s in enumerate(segments)
+        if starts[i] < end_ms and (i + 1 == len(segments) or starts[i + 1] > start_ms)
+    ]
+
+
+@pytest.fixture
+def segments():
+    return make_segments(400)
+
+
+@pytest.fixture
+def transcript(segments):
+    # Small blocks so most ranges span several of them
+    return CompressedTranscript.from_segments(segments, block_bytes=256)
+
+
+def test_round_trip(segments, transcript):
+    restored = CompressedTranscript.from_dict(transcript.to_dict())
+
+    assert restored.text() == " ".join(s["text"].strip() for s in segments)
+    assert len(restored) == len(segments)
+    assert restored.duration == transcript.duration
+    assert len(set(transcript.block_starts)) > 10
+
+
+def test_ranges_across_block_boundaries(segments, transcript):
+    rng = random.Random(1)
+    for _ in range(300):
+        start = rng.uniform(-5, transcript.duration + 5)
+        end = start + rng.uniform(0, 120)
+
+        expected = expected_segments(segments, start, end)
+        assert transcript.segments(start, end) == expected
+        assert transcript.slice(start, end) == " ".join(s["text"] for s in expected)
+
+
+def test_open_ranges(segments, transcript):
+    assert transcript.slice() == transcript.text()
+    assert transcript.segments(end=segments[3]["start"]) == expected_segments(segments, 0, segments[3]["start"])
+    assert transcript.slice(start=segments[-1]["start"]) == segments[-1]["text"].strip()
+
+
+def test_range_past_the_end_is_empty(transcript):
+    assert transcript.slice(transcript.duration, transcript.duration + 60) == ""
+    assert transcript.segments(transcript.duration + 1, transcript.duration + 60) == []
+
+
+def test_unsorted_and_empty_segments():
+    transcript = CompressedTranscript.from_segments([
+        {"text": "first", "start": 5, "dur": 2},
+        {"text": "  ", "start": 6, "dur": 1},
+        {"text": "second", "start": 3, "dur": 1},
+        {"text": "third", "start": "bad", "dur": None},
+    ])
+
+    assert transcript.text() == "first second third"
+    assert [s["start"] for s in transcript.segments()] == [5.0, 5.0, 5.0]
@@ -6,12 +6,28 @@ from datetime import date
 today = date.today().strftime("%B %d, %Y")
 
 
+# Bump when a prompt's meaning changes without its text changing (e.g. model
+# behaviour tweaks) to invalidate every cached summary built from it.
+PROMPT_VERSION = "1"
+
+
 TRANSCRIPT_PROMPT = """You are a helpful assistant that gives a really detailed summary of YouTube videos. 
 BE AS DETAILED AS POSSIBLE!!!!
 Your user should be able to understand everything about the video from your summary without having to watch it. 
 Provide the video resources at the end of your summary, incase the user wants to check out the video
 """
 
+CHUNK_SUMMARY_PROMPT = """You are summarizing part {part} of {total} of a long YouTube video transcript.
+Summarize this part in detail, keeping every key point, example, name and number in the order they appear.
+Do not add an introduction or conclusion; your summary will be merged with the summaries of the other parts.
+"""
+
+SEGMENT_PROMPT = """You are a helpful assistant that gives a detailed summary of one section of a YouTube video.
+The transcript in video_info only covers the part of the video between its `start` and `end` timestamps.
+Summarize what happens in that section in detail, in order, and mention the time range in your answer.
+Do not describe the rest of the video; only the title and description tell you what it is about.
+"""
+
 SYSTEM_PROMPT = """You are a helpful assistant that can search for youtube videos,
 get transcripts, and answer questions.
 
@@ -22,6 +38,8 @@ The videos should be a dictionary with the video details such as video_id, title
 if any of the videos seem to be the users query in your json message give a brief description of the video but STILL return the videos so the user can choose
 
 If the input is a youtube URL get the transcript for the video and return it as text
+If the user asks about a specific part of a video (for example "between 12:00 and 20:00") get only that
+part with get_transcript_segment instead of the whole transcript
 
 If the user is asking a question answer using information from past conversations;
 Today's date is {today}."""
@@ -58,6 +76,28 @@ FUNCTION_CALL_CONFIG = {
                         },
                         "required": ["youtube_url"]
                     }
+                },
+                {
+                    "name": "get_transcript_segment",
+                    "description": "Fetch the transcript of one part of a YouTube video, between a start and an end time. Use it when the user asks about a specific time range of a video.",
+                    "parameters": {
+                        "type": "object",
+                        "properties": {
+                            "youtube_url": {
+                                "type": "string",
+                                "description": "The URL of the YouTube video."
+                            },
+                            "start": {
+                                "type": "string",
+                                "description": "Start of the range, as a timestamp such as '12:00' or '1:02:30', or a number of seconds."
+                            },
+                            "end": {
+                                "type": "string",
+                                "description": "End of the range, in the same format as start."
+                            }
+                        },
+                        "required": ["youtube_url", "start", "end"]
+                    }
                 }
             ]
         }
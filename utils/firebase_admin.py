@@ -1,10 +0,0 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
-from core.config import get_settings
-
-settings = get_settings()
-
-cred = credentials.Certificate(settings.FIREBASE_CREDENTIALS)
-firebase_admin.initialize_app(cred)
-
-db = firestore.client() 
\ No newline at end of file
@@ -0,0 +1,19 @@
+# Rough average for English text; good enough for budgeting prompt sizes
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def truncate_to_tokens(text: str, max_tokens: int, marker: str = " …") -> str:
+    """
+    Cut text down to roughly `max_tokens`, on a word boundary where possible.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max(max_chars - len(marker), 0)]
+    if " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return f"{cut}{marker}"
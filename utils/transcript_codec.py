@@ -0,0 +1,224 @@
+import base64
+import struct
+import zlib
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    # Fall back to zlib, which is always available
+    zstandard = None
+
+
+FORMAT_VERSION = 1
+# Uncompressed bytes per independently compressed block
+BLOCK_BYTES = 16 * 1024
+SEPARATOR = b" "
+
+
+def _pack(values: Iterable[int]) -> str:
+    values = list(values)
+    return base64.b64encode(struct.pack(f"<{len(values)}I", *values)).decode("ascii")
+
+
+def _unpack(data: str) -> Tuple[int, ...]:
+    raw = base64.b64decode(data)
+    return struct.unpack(f"<{len(raw) // 4}I", raw)
+
+
+def _compress(codec: str, block: bytes) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(block)
+    return zlib.compress(block, 9)
+
+
+def _decompress(codec: str, block: bytes) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read this transcript")
+        return zstandard.ZstdDecompressor().decompress(block)
+    return zlib.decompress(block)
+
+
+def _seconds(value) -> float:
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class CompressedTranscript:
+    """
+    Transcript text compressed in independent blocks, with packed per-segment
+    start times (milliseconds) and byte offsets into the joined text.
+
+    A time range maps to a byte range through the segment index, and only the
+    blocks overlapping that range are decompressed. `to_dict` gives a JSON
+    serialisable form for the caches; `from_dict` reads it back.
+    """
+
+    def __init__(self, codec: str, blocks: bytes, block_offsets: Tuple[int, ...], block_starts: Tuple[int, ...],
+                 starts: Tuple[int, ...], offsets: Tuple[int, ...], duration_ms: int, size: int):
+        self.codec = codec
+        self.blocks = blocks
+        # Compressed position of each block, plus the end of the last one
+        self.block_offsets = block_offsets
+        # Uncompressed position of the first byte of each block
+        self.block_starts = block_starts
+        self.starts = starts
+        self.offsets = offsets
+        self.duration_ms = duration_ms
+        self.size = size
+
+    @classmethod
+    def from_segments(cls, segments: List[Dict], block_bytes: int = BLOCK_BYTES) -> "CompressedTranscript":
+        """
+        Build from youtube-transcript.io segments (`text`, `start` and `dur` in seconds).
+        """
+        codec = "zstd" if zstandard is not None else "zlib"
+        starts, offsets = [], []
+        block_starts, block_offsets = [], [0]
+        compressed, pending = [], bytearray()
+        position = pending_start = 0
+        duration_ms = 0
+
+        for segment in segments:
+            text = segment.get("text", "").strip()
+            if not text:
+                continue
+            data = text.encode("utf-8")
+            if position:
+                data = SEPARATOR + data
+
+            start_ms = int(_seconds(segment.get("start")) * 1000)
+            # Keep the time index sorted even if the source is not
+            start_ms = max(start_ms, starts[-1] if starts else 0)
+            starts.append(start_ms)
+            offsets.append(position)
+            duration_ms = max(duration_ms, start_ms + int(_seconds(segment.get("dur")) * 1000))
+
+            # Blocks end on segment boundaries
+            if pending and len(pending) + len(data) > block_bytes:
+                block_starts.append(pending_start)
+                compressed.append(_compress(codec, bytes(pending)))
+                block_offsets.append(block_offsets[-1] + len(compressed[-1]))
+                pending, pending_start = bytearray(), position
+
+            pending += data
+            position += len(data)
+
+        if pending:
+            block_starts.append(pending_start)
+            compressed.append(_compress(codec, bytes(pending)))
+            block_offsets.append(block_offsets[-1] + len(compressed[-1]))
+
+        return cls(
+            codec=codec,
+            blocks=b"".join(compressed),
+            block_offsets=tuple(block_offsets),
+            block_starts=tuple(block_starts),
+            starts=tuple(starts),
+            offsets=tuple(offsets),
+            duration_ms=duration_ms,
+            size=position
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CompressedTranscript":
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported transcript format: {data.get('version')}")
+        return cls(
+            codec=data["codec"],
+            blocks=base64.b64decode(data["blocks"]),
+            block_offsets=_unpack(data["block_offsets"]),
+            block_starts=_unpack(data["block_starts"]),
+            starts=_unpack(data["starts"]),
+            offsets=_unpack(data["offsets"]),
+            duration_ms=data["duration_ms"],
+            size=data["size"]
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": FORMAT_VERSION,
+            "codec": self.codec,
+            "blocks": base64.b64encode(self.blocks).decode("ascii"),
+            "block_offsets": _pack(self.block_offsets),
+            "block_starts": _pack(self.block_starts),
+            "starts": _pack(self.starts),
+            "offsets": _pack(self.offsets),
+            "duration_ms": self.duration_ms,
+            "size": self.size
+        }
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def duration(self) -> float:
+        return self.duration_ms / 1000
+
+    def _read(self, begin: int, end: int) -> bytes:
+        """
+        Uncompressed bytes [begin, end), decompressing only the blocks they span.
+        """
+        if begin >= end:
+            return b""
+        first = bisect_right(self.block_starts, begin) - 1
+        last = bisect_left(self.block_starts, end)
+        data = b"".join(
+            _decompress(self.codec, self.blocks[self.block_offsets[i]:self.block_offsets[i + 1]])
+            for i in range(first, last)
+        )
+        base = self.block_starts[first]
+        return data[begin - base:end - base]
+
+    def _segment_range(self, start: Optional[float], end: Optional[float]) -> Tuple[int, int]:
+        """
+        Indexes [first, last) of the segments overlapping the time range in seconds.
+        """
+        if start is not None and start * 1000 >= self.duration_ms:
+            return 0, 0
+        first = 0
+        if start is not None:
+            # The segment in progress at `start` is included
+            first = max(bisect_right(self.starts, int(start * 1000)) - 1, 0)
+        last = len(self.starts)
+        if end is not None:
+            last = bisect_left(self.starts, int(end * 1000))
+        return first, max(first, last)
+
+    def text(self) -> str:
+        return self._read(0, self.size).decode("utf-8")
+
+    def slice(self, start: Optional[float] = None, end: Optional[float] = None) -> str:
+        """
+        Text of the segments between `start` and `end` seconds.
+        """
+        first, last = self._segment_range(start, end)
+        if first == last:
+            return ""
+        stop = self.offsets[last] if last < len(self.offsets) else self.size
+        return self._read(self.offsets[first], stop).decode("utf-8").lstrip()
+
+    def segments(self, start: Optional[float] = None, end: Optional[float] = None) -> List[Dict]:
+        """
+        The segments between `start` and `end` seconds as `{"start", "text"}` dicts.
+        """
+        first, last = self._segment_range(start, end)
+        if first == last:
+            return []
+        begin = self.offsets[first]
+        stop = self.offsets[last] if last < len(self.offsets) else self.size
+        data = self._read(begin, stop)
+
+        bounds = list(self.offsets[first:last]) + [stop]
+        return [
+            {
+                "start": self.starts[i] / 1000,
+                "text": data[bounds[i - first] - begin:bounds[i - first + 1] - begin].decode("utf-8").strip()
+            }
+            for i in range(first, last)
+        ]
+
@@ -0,0 +1,85 @@
+import json
+import os
+import uuid
+from typing import Dict, List, Optional
+import numpy as np
+
+
+class VectorIndex:
+    """
+    Brute-force cosine similarity index over unit-normalised float32 vectors.
+
+    Every search is a single matrix-vector product, which for the few thousand
+    chunks of a session takes well under a millisecond and needs no training or
+    tuning. Each vector carries a JSON serialisable metadata dict.
+    """
+
+    def __init__(self, vectors: Optional[np.ndarray] = None, metadata: Optional[List[Dict]] = None):
+        self.vectors = vectors if vectors is not None else np.zeros((0, 0), dtype=np.float32)
+        self.metadata: List[Dict] = metadata or []
+
+    def __len__(self) -> int:
+        return len(self.metadata)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def add(self, vectors, metadata: List[Dict]) -> None:
+        vectors = self._normalize(np.asarray(vectors, dtype=np.float32).reshape(len(metadata), -1))
+        if len(self) == 0:
+            self.vectors = vectors
+        elif vectors.shape[1] != self.vectors.shape[1]:
+            raise ValueError(f"Expected {self.vectors.shape[1]} dimensions, got {vectors.shape[1]}")
+        else:
+            self.vectors = np.vstack([self.vectors, vectors])
+        self.metadata.extend(metadata)
+
+    def search(self, vector, k: int = 4, min_score: float = 0.0) -> List[Dict]:
+        """
+        Return up to `k` metadata dicts, best first, each with its cosine `score`.
+        """
+        if len(self) == 0 or k <= 0:
+            return []
+
+        query = self._normalize(np.asarray(vector, dtype=np.float32).reshape(1, -1))[0]
+        scores = self.vectors @ query
+
+        k = min(k, len(scores))
+        # argpartition finds the top k in linear time; only those k are sorted
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            {**self.metadata[i], "score": float(scores[i])}
+            for i in top if scores[i] >= min_score
+        ]
+
+    def save(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # A unique temp name, without the .npz suffix, so concurrent writers and
+        # directory scans never see each other's partial files
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                np.savez_compressed(f, vectors=self.vectors, metadata=np.array(json.dumps(self.metadata)))
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "VectorIndex":
+        """
+        Read an index written by `save`; a missing or unreadable file gives an empty index.
+        """
+        try:
+            with np.load(path) as data:
+                return cls(vectors=data["vectors"], metadata=json.loads(str(data["metadata"])))
+        except (FileNotFoundError, OSError, ValueError, KeyError):
+            return cls()